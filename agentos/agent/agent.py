@@ -1,9 +1,4 @@
-import sys
-import os
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(current_dir))
-sys.path.insert(0, project_root)
-
+import time
 import inspect
 
 from agentos.memory import TemporaryMemory,Message,Role
@@ -11,7 +6,11 @@ from agentos.prompt import DEFAULT_PROMPT
 
 from typing import List
 
-from agentos.utils import call_model
+from agentos.utils import call_model,stream_model
+from agentos.utils import metrics
+
+TOOL_CALL_SECONDS = metrics.histogram("agentos_tool_call_seconds","Agent.call_tool latency")
+EARLY_DISPATCH = metrics.counter("agentos_react_early_dispatch_total","Streamed ReAct responses cut off once the tool call was complete")
 
 
 def parse_tool_info(tools):
@@ -22,6 +21,52 @@ def parse_tool_info(tools):
         # info = info+tool.run.__doc__
         info = info+inspect.cleandoc(tool.run.__doc__)
     return info
+
+
+class StreamingReActParser:
+    def __init__(
+        self,
+        arity:dict
+    ):
+        """Parse a streamed thought:/function:/argumentN: response line by line.
+
+        Args:
+           arity: The number of arguments of each tool, keyed by function name.
+        """
+        self.arity=arity
+        self.buffer=""
+        self.lines=[]
+
+    def feed(
+        self,
+        delta:str
+    ):
+        """Add a delta; return True once the function name and all of its arguments have arrived."""
+        self.buffer+=delta
+        *complete,self.buffer=self.buffer.split("\n")
+        self.lines.extend(line for line in complete if line.strip())
+        return self.complete()
+
+    def tool_name(self):
+        return self.lines[1].split(":",1)[-1].strip() if len(self.lines)>1 else ""
+
+    def complete(self):
+        tool_name=self.tool_name()
+        # an unknown function is never complete: read the whole response and let act() report it
+        return tool_name in self.arity and len(self.lines)>=2+self.arity[tool_name]
+
+    def finish(self):
+        """The consumed text and the parsed (thought, tool_name, tool_args)."""
+        if self.buffer.strip() and not self.complete():
+            self.lines.append(self.buffer)
+        self.buffer=""
+        lines=self.lines
+        tool_name=self.tool_name()
+        if tool_name in self.arity:
+            lines=lines[:2+self.arity[tool_name]]
+        thought=lines[0].split(":",1)[-1].lstrip() if lines else ""
+        tool_args=[line.split(":",1)[-1].lstrip() for line in lines[2:]]
+        return "\n".join(lines),thought,tool_name,tool_args
      
     
 
@@ -32,37 +77,58 @@ class Agent:
         model:dict=None,
         tools:List=None,
         api_key: str | None = None,
+        stream_reason:bool=False,
+        memory=None,
     ):
+        """
+        Args:
+           memory: The conversation memory, e.g. MemoryStore(...).session(id) to resume
+              a persisted session; a new TemporaryMemory by default.
+           stream_reason: Stream each ReAct response and dispatch the tool as soon as its
+              function name and all arguments have arrived, cancelling the trailing tokens.
+        """
         self.name = name
         self.model = model
         self.api_key = api_key
+        self.stream_reason = stream_reason
 
         self.tools={}
         for tool in tools:
             self.tools[tool.__class__.__name__]=tool
          
         
-        self.memory = TemporaryMemory()
+        self.memory = memory if memory is not None else TemporaryMemory()
+        # accumulated seconds spent waiting on the model and running tools
+        self.timings = {"llm":0.0,"tool":0.0}
 
         tool_info = ""
         if tools is not None:
             tool_info=parse_tool_info(tools)
         
          
-        self.memory.add_memory(Message(Role.SYSTEM,DEFAULT_PROMPT.format(tool_info)))
+        # a resumed session already starts with its system prompt
+        if not self.memory.memory:
+            self.memory.add_memory(Message(Role.SYSTEM,DEFAULT_PROMPT.format(tool_info)))
+        # number of arguments of each tool, to know when a streamed call is complete
+        self.arity={"finish":0}
+        for name,tool in self.tools.items():
+            self.arity[name]=len(inspect.signature(tool.run).parameters)
         #print(self.memory.memory[0]['content'])
     def call_tool(
         self,
         tool_name:str,
         tool_args:List
     ):
-        return str(self.tools[tool_name].run(*tool_args))
+        with TOOL_CALL_SECONDS.time(tool=tool_name):
+            return str(self.tools[tool_name].run(*tool_args))
 
     def reason(
         self,
     ):
         
+        start = time.perf_counter()
         response = call_model(self.memory.memory,self.api_key) #需要改这里
+        self.timings["llm"] += time.perf_counter()-start
         
         self.memory.add_memory(Message(Role.ASSISTANT,response))
         # print(response)
@@ -82,6 +148,28 @@ class Agent:
                 
         print(response)        
         return thought,tool_name,tool_args
+
+    def reason_stream(
+        self,
+    ):
+        """Like reason, but stops reading the response once the tool call is complete."""
+        start = time.perf_counter()
+        parser = StreamingReActParser(self.arity)
+        stream = stream_model(self.memory.memory,self.api_key)
+        try:
+            for delta in stream:
+                if parser.feed(delta):
+                    EARLY_DISPATCH.inc()
+                    break
+        finally:
+            stream.close()
+        self.timings["llm"] += time.perf_counter()-start
+
+        response,thought,tool_name,tool_args = parser.finish()
+        # only the part that was acted on goes into the conversation
+        self.memory.add_memory(Message(Role.ASSISTANT,response))
+        print(response)
+        return thought,tool_name,tool_args
     
     def act(
         self,
@@ -91,7 +179,9 @@ class Agent:
         print(f"call tool:{tool_name}\nargs:{tool_args}")
         # print()
         
+        start = time.perf_counter()
         tool_call_res = self.call_tool(tool_name,tool_args)
+        self.timings["tool"] += time.perf_counter()-start
         self.memory.add_memory(Message(Role.USER,"The "+tool_name+" function has been executed and the result is below:\n"+tool_call_res))
         
         print(f"tool_call_res:\n{tool_call_res}")
@@ -108,7 +198,7 @@ class Agent:
           
         while(True):
             print("-----------------------------reason-----------------------------")
-            thought,tool_name,tool_args=self.reason()
+            thought,tool_name,tool_args=self.reason_stream() if self.stream_reason else self.reason()
             if(tool_name=='finish'):
                 break
 
@@ -1,2 +1,3 @@
 from agentos.memory.memory import TemporaryMemory
-from agentos.memory.message import Message,Role
\ No newline at end of file
+from agentos.memory.message import Message,Role
+from agentos.memory.persistent import MemoryStore,PersistentMemory
\ No newline at end of file
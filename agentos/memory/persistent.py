@@ -0,0 +1,188 @@
+import time
+import sqlite3
+import weakref
+import threading
+from collections import OrderedDict
+from typing import Dict,List
+from agentos.memory.message import Message
+
+# marks the point a session was cleared; messages before it are never loaded again
+CLEAR_ROLE = "__clear__"
+
+
+class MemoryStore:
+    def __init__(
+        self,
+        path:str="agent_memory.db",
+        window:int=20,
+        max_sessions:int=128
+    ):
+        """SQLite-backed, append-only message log shared by many sessions.
+
+        Args:
+           path: The SQLite database file.
+           window: Turns (a user message and everything up to the next one) loaded into
+              and kept in a session's in-process memory. The ReAct loop writes tool
+              results as user messages, so every tool round counts as a turn.
+           max_sessions: Sessions kept in the in-process LRU; evicted ones are reloaded
+              from disk on next use.
+
+        Several processes may share the database: seq is assigned inside the INSERT
+        under a write lock, so concurrent appends to one session do not collide.
+        """
+        self.path=path
+        self.window=window
+        self.max_sessions=max_sessions
+        self.lock=threading.RLock()
+        self.cache=OrderedDict()
+        # sessions evicted from the LRU but still held elsewhere (e.g. by an Agent)
+        self.live=weakref.WeakValueDictionary()
+        self.conn=sqlite3.connect(path,timeout=30,check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            )
+        """)
+        self.conn.commit()
+
+    def session(
+        self,
+        session_id:str
+    ):
+        """The PersistentMemory of a session, loaded with its last `window` turns.
+
+        There is at most one PersistentMemory per session in the process: one evicted
+        from the LRU while still in use is returned again rather than reloaded.
+        """
+        with self.lock:
+            memory=self.cache.get(session_id)
+            if memory is None:
+                memory=self.live.get(session_id)
+                if memory is None:
+                    memory=PersistentMemory(self,session_id,self.window)
+                    self.live[session_id]=memory
+                self.cache[session_id]=memory
+                while len(self.cache)>self.max_sessions:
+                    self.cache.popitem(last=False)
+            else:
+                self.cache.move_to_end(session_id)
+            return memory
+
+    def append(
+        self,
+        session_id:str,
+        role:str,
+        content:str
+    )->int:
+        with self.lock:
+            # BEGIN IMMEDIATE takes the write lock first, so MAX(seq) is current across processes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor=self.conn.execute(
+                    "INSERT INTO messages (session_id, seq, role, content, created_at) "
+                    "SELECT ?, COALESCE(MAX(seq), -1) + 1, ?, ?, ? FROM messages WHERE session_id=?",
+                    (session_id,role,content,time.time(),session_id)
+                )
+                seq=self.conn.execute("SELECT seq FROM messages WHERE rowid=?",(cursor.lastrowid,)).fetchone()[0]
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+            return seq
+
+    def load(
+        self,
+        session_id:str,
+        turns:int=None
+    )->List[Dict]:
+        """The session's system prompt (its first message, if a system message) and last `turns` turns."""
+        turns=turns if turns is not None else self.window
+        with self.lock:
+            cleared=self.conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) FROM messages WHERE session_id=? AND role=?",(session_id,CLEAR_ROLE)
+            ).fetchone()[0]
+            head=self.conn.execute(
+                "SELECT seq, role, content FROM messages WHERE session_id=? AND seq>? ORDER BY seq LIMIT 1",
+                (session_id,cleared)
+            ).fetchone()
+            if head is None:
+                return []
+            start=self.conn.execute(
+                "SELECT seq FROM messages WHERE session_id=? AND seq>? AND role='user' ORDER BY seq DESC LIMIT 1 OFFSET ?",
+                (session_id,cleared,max(turns-1,0))
+            ).fetchone()
+            start=start[0] if start is not None else head[0]
+            rows=self.conn.execute(
+                "SELECT seq, role, content FROM messages WHERE session_id=? AND seq>=? ORDER BY seq",
+                (session_id,start)
+            ).fetchall()
+        if head[1]=="system" and head[0]<start:
+            rows.insert(0,head)
+        return [{"role":role,"content":content} for _,role,content in rows]
+
+    def history(
+        self,
+        session_id:str
+    )->List[Dict]:
+        """Every message ever written to the session, clears included."""
+        with self.lock:
+            rows=self.conn.execute(
+                "SELECT role, content, created_at FROM messages WHERE session_id=? ORDER BY seq",(session_id,)
+            ).fetchall()
+        return [{"role":role,"content":content,"created_at":created_at} for role,content,created_at in rows]
+
+    def sessions(self)->List[str]:
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT session_id FROM messages")]
+
+    def close(self):
+        with self.lock:
+            self.cache.clear()
+            self.conn.close()
+
+
+class PersistentMemory:
+    def __init__(
+        self,
+        store:MemoryStore,
+        session_id:str,
+        window:int=20
+    ):
+        """Drop-in for TemporaryMemory whose messages survive restarts.
+
+        Every add_memory is appended to the store; `memory` holds the session's system
+        prompt plus at most `window` recent turns, so long sessions stay small in RAM.
+        A turn starts at each user message, tool results of the ReAct loop included.
+        """
+        self.store=store
+        self.session_id=session_id
+        self.window=window
+        self.memory=store.load(session_id,window)
+
+    def add_memory(
+        self,
+        msg:Message
+    ):
+        self.store.append(self.session_id,msg.role,msg.content)
+        self.memory.append({"role":msg.role,"content":msg.content})
+        self.trim()
+
+    def trim(self):
+        """Drop the oldest turns beyond the window, keeping a leading system prompt."""
+        start=1 if self.memory and self.memory[0]["role"]=="system" else 0
+        users=[i for i in range(start,len(self.memory)) if self.memory[i]["role"]=="user"]
+        if len(users)>self.window:
+            del self.memory[start:users[len(users)-self.window]]
+
+    def clear(
+        self
+    ):
+        self.store.append(self.session_id,CLEAR_ROLE,"")
+        self.memory=[]
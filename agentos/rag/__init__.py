@@ -1,6 +1,40 @@
-from agentos.rag.load import DataLoader
-from agentos.rag.split import CharacterSplit,RowSplit
-from agentos.rag.embedding import EmbeddingModel
-from agentos.rag.store import ChromaDB
-from agentos.rag.data import merge_content
-from agentos.rag.rerank import Rerank
\ No newline at end of file
+# Submodules are imported on first attribute access (PEP 562), so `import agentos.rag`
+# does not load sentence-transformers, chromadb, pypdf or numpy until they are used.
+import importlib
+
+_EXPORTS = {
+    "DataLoader": "agentos.rag.load",
+    "CharacterSplit": "agentos.rag.split",
+    "RowSplit": "agentos.rag.split",
+    "SentenceSplit": "agentos.rag.split",
+    "EmbeddingModel": "agentos.rag.embedding",
+    "ChromaDB": "agentos.rag.store",
+    "merge_content": "agentos.rag.data",
+    "Chunk": "agentos.rag.data",
+    "ChunkBatch": "agentos.rag.data",
+    "Rerank": "agentos.rag.rerank",
+    "SemanticCache": "agentos.rag.cache",
+    "RetrievalServer": "agentos.rag.service",
+    "RemoteEmbeddingModel": "agentos.rag.service",
+    "RemoteRerank": "agentos.rag.service",
+    "RemoteChromaDB": "agentos.rag.service",
+    "BatchingEmbeddingModel": "agentos.rag.batching",
+    "Projection": "agentos.rag.reduce",
+    "ConcurrentStore": "agentos.rag.concurrency",
+    "ReadWriteLock": "agentos.rag.concurrency",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
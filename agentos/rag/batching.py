@@ -0,0 +1,134 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import List
+from agentos.rag.data import BaseData
+from agentos.utils import metrics
+
+BATCH_SIZE = metrics.histogram("agentos_embedding_batch_size","Texts per micro-batch",buckets=(1,2,4,8,16,32,64,128))
+QUEUE_DELAY = metrics.histogram("agentos_embedding_queue_delay_seconds","Time a query waited for its micro-batch")
+
+
+class BatchingEmbeddingModel:
+    def __init__(
+        self,
+        embedding_model,
+        max_batch_size:int=32,
+        max_wait_ms:float=5
+    ):
+        """Micro-batch concurrent query embeddings into one forward pass.
+
+        Query encodes (__call__, as used by Chroma for query_texts) that arrive within
+        max_wait_ms of each other are embedded together, up to max_batch_size texts.
+        Bulk encode() calls go straight to the wrapped model. When the wrapped model has a
+        query cache, hits are returned without entering the queue.
+
+        Args:
+           embedding_model: The wrapped EmbeddingModel.
+           max_batch_size: The maximum number of texts in one forward pass.
+           max_wait_ms: How long the first request of a batch may wait for others.
+        """
+        self.embedding_model=embedding_model
+        self.max_batch_size=max_batch_size
+        self.max_wait_ms=max_wait_ms
+        self.requests=queue.Queue()
+        self.worker=None
+        self.worker_lock=threading.Lock()
+        self.stats_lock=threading.Lock()
+        self.batches=0
+        self.batched_requests=0
+        self.batched_texts=0
+        self.max_seen_batch=0
+        self.total_queue_delay=0.0
+        self.max_queue_delay=0.0
+
+    def __getattr__(self, name):
+        return getattr(self.embedding_model,name)
+
+    def start(self):
+        with self.worker_lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker=threading.Thread(target=self.run,daemon=True,name="embedding-batcher")
+                self.worker.start()
+
+    def __call__(self, input:List[str]):
+        texts=list(input)
+        if not texts:
+            return []
+        if not getattr(self.embedding_model,"query_cache_size",0):
+            return self.submit(texts)
+        # cache hits are answered on the caller's thread; only misses wait for a batch
+        embeddings,missing=self.embedding_model.lookup(texts)
+        if missing:
+            encoded=self.submit([text for text,_ in missing.values()])
+            self.embedding_model.store(missing,encoded,embeddings)
+        return embeddings
+
+    def submit(self, texts:List[str]):
+        future=Future()
+        self.start()
+        self.requests.put((texts,future,time.perf_counter()))
+        return future.result()
+
+    def encode(
+        self,
+        data:List[BaseData]
+    ):
+        return self.embedding_model.encode(data)
+
+    def collect(self):
+        batch=[self.requests.get()]
+        size=len(batch[0][0])
+        deadline=batch[0][2]+self.max_wait_ms/1000
+        while size<self.max_batch_size:
+            # requests already queued join the batch even once the deadline has passed
+            timeout=max(deadline-time.perf_counter(),0)
+            try:
+                request=self.requests.get(timeout=timeout) if timeout else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            size+=len(request[0])
+        return batch,size
+
+    def run(self):
+        while True:
+            batch,size=self.collect()
+            start=time.perf_counter()
+            texts=[t for request in batch for t in request[0]]
+            try:
+                encode=getattr(self.embedding_model,"encode_queries",self.embedding_model)
+                embeddings=encode(texts)
+            except Exception as e:
+                for _,future,_ in batch:
+                    future.set_exception(e)
+                continue
+
+            offset=0
+            for request_texts,future,_ in batch:
+                future.set_result(list(embeddings[offset:offset+len(request_texts)]))
+                offset+=len(request_texts)
+
+            BATCH_SIZE.observe(size)
+            with self.stats_lock:
+                self.batches+=1
+                self.batched_requests+=len(batch)
+                self.batched_texts+=size
+                self.max_seen_batch=max(self.max_seen_batch,size)
+                for _,_,enqueued in batch:
+                    delay=start-enqueued
+                    QUEUE_DELAY.observe(delay)
+                    self.total_queue_delay+=delay
+                    self.max_queue_delay=max(self.max_queue_delay,delay)
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                "batches":self.batches,
+                "requests":self.batched_requests,
+                "mean_batch_size":self.batched_texts/self.batches if self.batches else 0.0,
+                "max_batch_size":self.max_seen_batch,
+                "mean_queue_delay_ms":1000*self.total_queue_delay/self.batched_requests if self.batched_requests else 0.0,
+                "max_queue_delay_ms":1000*self.max_queue_delay
+            }
@@ -0,0 +1,190 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from agentos.rag.store import ChromaDB
+from agentos.rag.embedding import EmbeddingModel
+from agentos.utils import metrics
+
+CACHE_REQUESTS = metrics.counter("agentos_semantic_cache_requests_total","Semantic cache lookups")
+CACHE_EVICTIONS = metrics.counter("agentos_semantic_cache_evictions_total","Semantic cache entries deleted")
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStore(ChromaDB):
+    collection_name = "semantic_cache"
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        embedding_model:EmbeddingModel,
+        threshold:float=0.92,
+        ttl:float=24*3600,
+        max_entries:int=10000,
+        evict_interval:float=60,
+        if_persist:bool=False,
+        dir:str=None
+    ):
+        """Cache answers keyed on the embedding of the question.
+
+        Args:
+           embedding_model: The embedding model used to embed questions.
+           threshold: The minimum cosine similarity for a cached answer to be returned.
+           ttl: Seconds before a cached answer expires.
+           max_entries: The most entries kept; the oldest are deleted beyond it.
+           evict_interval: Seconds between sweeps of expired entries, run from add().
+           if_persist: Whether persist the cache to disk.
+           dir: The dir to persist.
+        """
+        self.embedding_model=embedding_model
+        self.threshold=threshold
+        self.ttl=ttl
+        self.max_entries=max_entries
+        self.evict_interval=evict_interval
+        if if_persist and dir and os.path.exists(dir):
+            self.store=CacheStore.load_document(embedding_model=embedding_model,dir=dir)
+        else:
+            self.store=CacheStore.create_document(
+                embedding_model=embedding_model,
+                if_persist=if_persist,
+                dir=dir,
+                metadata={"hnsw:space":"cosine"}
+            )
+        self.hits=0
+        self.misses=0
+        self.errors=0
+        self.evicted=0
+        self.last_evict=time.monotonic()
+        self.lock=threading.Lock()
+
+    def embed(
+        self,
+        query:str
+    ):
+        """The question's embedding, or None if the embedding model failed."""
+        try:
+            embedding=self.embedding_model([query])[0]
+        except Exception:
+            self.error("embed")
+            return None
+        # EmbeddingModel returns arrays, RemoteEmbeddingModel plain lists
+        return embedding.tolist() if hasattr(embedding,"tolist") else list(embedding)
+
+    def error(
+        self,
+        operation:str
+    ):
+        # a broken cache must not fail the request, but it must not pass for a cold one either
+        logger.exception("semantic cache %s failed",operation)
+        with self.lock:
+            self.errors+=1
+        CACHE_REQUESTS.inc(result="error")
+
+    def lookup(
+        self,
+        query:str,
+        model:str,
+        embedding=None
+    ):
+        """Return the cached answer of the closest question asked to the same model, or None."""
+        if embedding is None:
+            embedding=self.embed(query)
+            if embedding is None:
+                return None
+        where={"$and":[{"model":model},{"created_at":{"$gte":time.time()-self.ttl}}]}
+        try:
+            res=self.store.collection.query(
+                query_embeddings=[embedding],
+                n_results=1,
+                where=where,
+                include=["metadatas","distances"]
+            )
+        except Exception:
+            self.error("lookup")
+            return None
+
+        if res['metadatas'] and res['metadatas'][0]:
+            similarity=1-res['distances'][0][0]
+            if similarity>=self.threshold:
+                with self.lock:
+                    self.hits+=1
+                CACHE_REQUESTS.inc(result="hit")
+                return res['metadatas'][0][0]['answer']
+        with self.lock:
+            self.misses+=1
+        CACHE_REQUESTS.inc(result="miss")
+        return None
+
+    def add(
+        self,
+        query:str,
+        answer:str,
+        model:str,
+        embedding=None
+    )->bool:
+        """Cache an answer; returns False (after logging) if it could not be stored."""
+        if embedding is None:
+            embedding=self.embed(query)
+            if embedding is None:
+                return False
+        try:
+            self.store.collection.add(
+                ids=[str(uuid.uuid4())],
+                embeddings=[embedding],
+                documents=[query],
+                metadatas=[{"model":model,"answer":answer,"created_at":time.time()}]
+            )
+            with self.lock:
+                due=time.monotonic()-self.last_evict>=self.evict_interval
+                if due:
+                    self.last_evict=time.monotonic()
+            if due or self.store.collection.count()>self.max_entries:
+                self.evict()
+        except Exception:
+            self.error("add")
+            return False
+        return True
+
+    def evict_expired(
+        self,
+    ):
+        """Delete every entry older than ttl."""
+        self.store.collection.delete(where={"created_at":{"$lt":time.time()-self.ttl}})
+
+    def evict(
+        self,
+    ):
+        """Delete expired entries, then the oldest ones down to 90% of max_entries."""
+        before=self.store.collection.count()
+        self.evict_expired()
+        size=self.store.collection.count()
+        if size>self.max_entries:
+            # trim below the cap so the full scan does not run again on the next add
+            res=self.store.collection.get(include=["metadatas"])
+            entries=sorted(zip(res['ids'],res['metadatas']),key=lambda e: e[1]['created_at'])
+            oldest=[id for id,_ in entries[:size-int(self.max_entries*0.9)]]
+            self.store.collection.delete(ids=oldest)
+            size-=len(oldest)
+        # concurrent adds can land between the counts
+        evicted=max(before-size,0)
+        with self.lock:
+            self.evicted+=evicted
+        CACHE_EVICTIONS.inc(evicted)
+
+    def stats(
+        self,
+    ):
+        with self.lock:
+            hits,misses,errors,evicted=self.hits,self.misses,self.errors,self.evicted
+        total=hits+misses
+        return {
+            "hits":hits,
+            "misses":misses,
+            "errors":errors,
+            "evicted":evicted,
+            "hit_rate":hits/total if total else 0.0,
+            "size":self.store.collection.count()
+        }
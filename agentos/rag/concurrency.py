@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict,List
+from agentos.rag.data import BaseData
+from agentos.utils import metrics
+
+STORE_POOL_WAIT = metrics.histogram("agentos_store_pool_wait_seconds","Time a store call waited for a pool slot")
+
+
+class ReadWriteLock:
+    """Many concurrent readers or one writer; waiting writers block new readers."""
+    def __init__(self):
+        self.cond=threading.Condition(threading.Lock())
+        self.readers=0
+        self.writer=False
+        self.waiting_writers=0
+
+    def acquire_read(self):
+        with self.cond:
+            while self.writer or self.waiting_writers:
+                self.cond.wait()
+            self.readers+=1
+
+    def release_read(self):
+        with self.cond:
+            self.readers-=1
+            if not self.readers:
+                self.cond.notify_all()
+
+    def acquire_write(self):
+        with self.cond:
+            self.waiting_writers+=1
+            try:
+                while self.writer or self.readers:
+                    self.cond.wait()
+            finally:
+                self.waiting_writers-=1
+            self.writer=True
+
+    def release_write(self):
+        with self.cond:
+            self.writer=False
+            self.cond.notify_all()
+
+    def read(self):
+        return _Locked(self.acquire_read,self.release_read)
+
+    def write(self):
+        return _Locked(self.acquire_write,self.release_write)
+
+
+class _Locked:
+    def __init__(self, acquire, release):
+        self.acquire=acquire
+        self.release=release
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class ConcurrentStore:
+    def __init__(
+        self,
+        store,
+        max_workers:int=4,
+        max_pending:int=64
+    ):
+        """Share one ChromaDB between threads (e.g. Streamlit sessions) and asyncio code.
+
+        Thread-safety guarantees:
+           - query_data may be called from any number of threads at once; queries run
+             concurrently with each other (their embeddings are merged by a
+             BatchingEmbeddingModel if the store uses one).
+           - add_data and fit_projection take the write lock: they wait for running
+             queries to finish, block new ones until they return, and never run
+             concurrently with each other. A query therefore sees a batch either
+             fully added or not at all.
+           - submit_query / aquery_data run on a pool of max_workers threads. At most
+             max_pending calls may be queued or running; further submits block (or,
+             for the async wrappers, wait without blocking the event loop).
+           - Direct use of store.collection bypasses the lock and is not covered.
+
+        A RemoteChromaDB can be wrapped for queries only: it has no embedding model or
+        add_data, so add_data and fit_projection raise NotImplementedError for it.
+
+        Args:
+           store: The wrapped ChromaDB (or, read-only, a RemoteChromaDB).
+           max_workers: Threads running queries submitted through the pool.
+           max_pending: Bound on queued plus running pool calls.
+        """
+        self.store=store
+        self.lock=ReadWriteLock()
+        self.executor=ThreadPoolExecutor(max_workers=max_workers,thread_name_prefix="store-query")
+        self.slots=threading.BoundedSemaphore(max_pending)
+
+    def __getattr__(self, name):
+        return getattr(self.store,name)
+
+    def require(self, method:str):
+        if not hasattr(self.store,method) or not hasattr(self.store,"embedding_model"):
+            raise NotImplementedError(f"{type(self.store).__name__} is read-only: ConcurrentStore.{method} needs a local ChromaDB")
+
+    def query_data(
+        self,
+        query_text:str,
+        query_num:int=10,
+        rerank:bool=False,
+        reranker=None,
+        where:Dict=None
+    )->List[BaseData]:
+        with self.lock.read():
+            return self.store.query_data(query_text,query_num=query_num,rerank=rerank,reranker=reranker,where=where)
+
+    def add_data(
+        self,
+        data:List[BaseData],
+        embeddings=None
+    ):
+        self.require("add_data")
+        if embeddings is None:
+            # embed outside the lock so queries keep running during the expensive part
+            embeddings=self.store.embedding_model.encode(data)
+        with self.lock.write():
+            return self.store.add_data(data,embeddings=embeddings)
+
+    def fit_projection(
+        self,
+        embeddings,
+        dim:int,
+        method:str="pca"
+    ):
+        self.require("fit_projection")
+        with self.lock.write():
+            return self.store.fit_projection(embeddings,dim,method)
+
+    def submit(
+        self,
+        fn,
+        *args,
+        **kwargs
+    ):
+        """Run fn on the pool once a slot is free; returns a concurrent.futures.Future."""
+        with STORE_POOL_WAIT.time():
+            self.slots.acquire()
+        try:
+            future=self.executor.submit(fn,*args,**kwargs)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def submit_query(
+        self,
+        query_text:str,
+        **kwargs
+    ):
+        return self.submit(self.query_data,query_text,**kwargs)
+
+    def query_many(
+        self,
+        query_texts:List[str],
+        **kwargs
+    )->List[List[BaseData]]:
+        """Run several queries in parallel on the pool and return their results in order."""
+        futures=[self.submit_query(q,**kwargs) for q in query_texts]
+        return [f.result() for f in futures]
+
+    async def _run(
+        self,
+        fn,
+        *args,
+        **kwargs
+    ):
+        loop=asyncio.get_running_loop()
+        # wait for a slot in the default executor so the event loop is never blocked
+        future=await loop.run_in_executor(None,functools.partial(self.submit,fn,*args,**kwargs))
+        return await asyncio.wrap_future(future)
+
+    async def aquery_data(
+        self,
+        query_text:str,
+        **kwargs
+    )->List[BaseData]:
+        return await self._run(self.query_data,query_text,**kwargs)
+
+    async def aadd_data(
+        self,
+        data:List[BaseData],
+        embeddings=None
+    ):
+        return await self._run(self.add_data,data,embeddings)
+
+    def shutdown(
+        self,
+        wait:bool=True
+    ):
+        self.executor.shutdown(wait=wait)
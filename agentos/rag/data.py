@@ -1,9 +1,7 @@
+from array import array
 from typing import Dict,Any,List
 
 class BaseData():
-    content = ""
-    metadata = {}
-
     def __init__(
         self,
         content:str,
@@ -34,8 +32,7 @@ class PdfData(BaseData):
         content:str,
         number_of_pages
     ):
-        self.content=content
-        self.metadata["number_of_pages"]=number_of_pages
+        super().__init__(content,{"number_of_pages":number_of_pages})
 
 class TextData(BaseData):
     def __init__(
@@ -43,8 +40,7 @@ class TextData(BaseData):
         content:str,
         encoding:str = "utf-8"
     ):
-        self.content=content
-        self.metadata["encoding"]=encoding
+        super().__init__(content,{"encoding":encoding})
          
 class JsonData(BaseData):
     def __init__(
@@ -52,8 +48,7 @@ class JsonData(BaseData):
         content:str,
         encoding:str = "utf-8"
     ):
-        self.content=content
-        self.metadata["encoding"]=encoding
+        super().__init__(content,{"encoding":encoding})
 
 class CsvData(BaseData):
     def __init__(
@@ -61,8 +56,112 @@ class CsvData(BaseData):
         content:str,
         encoding:str = "utf-8"
     ):
-        self.content=content
-        self.metadata["encoding"]=encoding
+        super().__init__(content,{"encoding":encoding})
+
+
+class Chunk:
+    """A (start, end) view into a source string; the text is only sliced out on get_content()."""
+    __slots__ = ("source","start","end","metadata","batch","index")
+
+    def __init__(
+        self,
+        source:str,
+        start:int,
+        end:int,
+        metadata:Dict[str,Any],
+        batch:"ChunkBatch"=None,
+        index:int=None
+    ):
+        self.source=source
+        self.start=start
+        self.end=end
+        self.metadata=metadata
+        self.batch=batch
+        self.index=index
+
+    def get_content(self):
+        return self.source[self.start:self.end]
+
+    def set_content(self,content:str):
+        self.source=content
+        self.start=0
+        self.end=len(content)
+
+    def get_metadata(self):
+        return self.metadata
+
+    def add_metadata(
+        self,
+        key:str,
+        value,
+    ):
+        if self.batch is not None:
+            self.metadata=self.batch.own_metadata(self.index)
+        self.metadata[key] = value
+
+
+class ChunkBatch:
+    """Columnar chunks of one source string: start/end offset arrays plus per-chunk metadata.
+
+    Splitters return a ChunkBatch instead of one string copy and BaseData per chunk.
+    It behaves as a sequence of Chunk views, so merge_content and other List[BaseData]
+    consumers keep working; ChromaDB.add_data reads the columns directly.
+    Chunks share the document metadata until one of them is given its own, either in
+    append() or by Chunk.add_metadata, which copies it first.
+    """
+    def __init__(
+        self,
+        source:str,
+        metadata:Dict[str,Any]=None
+    ):
+        self.source=source
+        self.starts=array("q")
+        self.ends=array("q")
+        # None marks a chunk that still reads the shared document metadata
+        self.metadatas=[]
+        self.metadata=metadata if metadata is not None else {}
+
+    def append(
+        self,
+        start:int,
+        end:int,
+        metadata:Dict[str,Any]=None
+    ):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.metadatas.append(metadata)
+
+    def metadata_of(self, index:int)->Dict[str,Any]:
+        metadata=self.metadatas[index]
+        return self.metadata if metadata is None else metadata
+
+    def own_metadata(self, index:int)->Dict[str,Any]:
+        """The chunk's own metadata dict, copied from the shared one on first write."""
+        if self.metadatas[index] is None:
+            self.metadatas[index]=dict(self.metadata)
+        return self.metadatas[index]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index,slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index=range(len(self))[index]
+        return Chunk(self.source,self.starts[index],self.ends[index],self.metadata_of(index),self,index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Chunk(self.source,self.starts[i],self.ends[i],self.metadata_of(i),self,i)
+
+    def contents(self)->List[str]:
+        source=self.source
+        return [source[start:end] for start,end in zip(self.starts,self.ends)]
+
+    def get_metadatas(self)->List[Dict[str,Any]]:
+        shared=self.metadata
+        return [shared if metadata is None else metadata for metadata in self.metadatas]
+
 
 def merge_content(
     data:List[BaseData]
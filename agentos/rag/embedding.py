@@ -1,17 +1,17 @@
-import sys
-import os
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(current_dir))
-sys.path.insert(0, project_root)
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List
+from agentos.rag.data import BaseData
+from agentos.utils import metrics
+from agentos.utils.metrics import timed
 
-__import__("pysqlite3")
-sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
+QUERY_CACHE_REQUESTS = metrics.counter("agentos_query_embedding_cache_total","Query embedding LRU lookups")
 
 
-import sentence_transformers #sentence_transformers download model from huggingface
-from typing import List
-from agentos.rag.data import BaseData
-from chromadb import Documents, Embeddings
+def normalize_query(text:str)->str:
+    """Cache key of a query: NFKC (full-width punctuation to ASCII) with collapsed whitespace."""
+    return " ".join(unicodedata.normalize("NFKC",text).split())
 
 
 class EmbeddingModel:
@@ -19,18 +19,121 @@ class EmbeddingModel:
         self,
         model_name:str,
         cache_dir:str=None,
+        backend:str="torch",
+        query_cache_size:int=1024,
         **kwargs
     ):
+        """
+        Args:
+           backend: "torch" (sentence-transformers) or "onnx" (ONNX Runtime, int8 quantized
+              by default and cached on disk; kwargs go to OnnxEncoder).
+           query_cache_size: Entries of the LRU of query embeddings keyed by normalized
+              text, 0 disables it. Documents (encode) bypass the cache.
+        """
         self.model_name=model_name
+        self.backend=backend
+        self.query_cache_size=query_cache_size
+        self.query_cache=OrderedDict()
+        self.query_cache_lock=threading.Lock()
+        self.query_cache_hits=0
+        self.query_cache_misses=0
         # "BAAI/bge-base-zh-v1.5"
         # cache_folder="/mnt/7T/xz"
-        self.embedding_model= sentence_transformers.SentenceTransformer(  
-            model_name, cache_folder=cache_dir,**kwargs
-        )
+        if backend=="onnx":
+            from agentos.rag.onnx_backend import OnnxEncoder
+            self.embedding_model=OnnxEncoder(model_name,cache_dir=cache_dir,**kwargs)
+        else:
+            import sentence_transformers #sentence_transformers download model from huggingface
+            self.embedding_model= sentence_transformers.SentenceTransformer(  
+                model_name, cache_folder=cache_dir,**kwargs
+            )
     
-    def __call__(self, input: Documents) -> Embeddings:
-        return  [self.embedding_model.encode(text) for text in input]
+    def __call__(self, input: List[str]) -> List:
+        texts=list(input)
+        if not self.query_cache_size:
+            return list(self.encode_queries(texts))
+        embeddings,missing=self.lookup(texts)
+        if missing:
+            # one batched forward pass for the distinct uncached texts
+            self.store(missing,self.encode_queries([text for text,_ in missing.values()]),embeddings)
+        return embeddings
+
+    @timed("agentos_embedding_encode_seconds","EmbeddingModel encode latency",path="query")
+    def encode_queries(self, texts:List[str]):
+        """Embed query texts with the model, bypassing the cache."""
+        return self.embedding_model.encode(texts)
+
+    def lookup(
+        self,
+        texts:List[str]
+    ):
+        """Cached embeddings of texts (None where uncached) and the misses.
+
+        Returns (embeddings, missing), missing mapping each distinct normalized key to
+        (the first original text with that key, the indices it fills). The normalized
+        text is only the cache key; the original text is what gets embedded, so query
+        vectors match the document vectors they are compared with.
+        """
+        embeddings=[None]*len(texts)
+        missing={}
+        with self.query_cache_lock:
+            for i,text in enumerate(texts):
+                key=normalize_query(text)
+                embedding=self.query_cache.get(key)
+                if embedding is None:
+                    missing.setdefault(key,(text,[]))[1].append(i)
+                else:
+                    self.query_cache.move_to_end(key)
+                    embeddings[i]=embedding
+            misses=sum(len(indices) for _,indices in missing.values())
+            self.query_cache_hits+=len(texts)-misses
+            self.query_cache_misses+=misses
+        if misses<len(texts):
+            QUERY_CACHE_REQUESTS.inc(len(texts)-misses,result="hit")
+        if misses:
+            QUERY_CACHE_REQUESTS.inc(misses,result="miss")
+        return embeddings,missing
+
+    def store(
+        self,
+        missing:dict,
+        encoded,
+        embeddings:List
+    ):
+        """Cache the embeddings of the misses returned by lookup and fill them into embeddings."""
+        with self.query_cache_lock:
+            for (key,(_,indices)),embedding in zip(missing.items(),encoded):
+                for i in indices:
+                    embeddings[i]=embedding
+                self.query_cache[key]=embedding
+                self.query_cache.move_to_end(key)
+            while len(self.query_cache)>self.query_cache_size:
+                self.query_cache.popitem(last=False)
+
+    def warm_up(
+        self,
+        queries:List[str],
+        batch_size:int=64
+    ):
+        """Pre-embed queries (most frequent first) into the query cache."""
+        # reversed so that the most frequent queries end up most recently used
+        queries=list(queries)[:self.query_cache_size][::-1]
+        for start in range(0,len(queries),batch_size):
+            self(queries[start:start+batch_size])
+
+    def query_cache_stats(
+        self,
+    ):
+        with self.query_cache_lock:
+            total=self.query_cache_hits+self.query_cache_misses
+            return {
+                "hits":self.query_cache_hits,
+                "misses":self.query_cache_misses,
+                "hit_rate":self.query_cache_hits/total if total else 0.0,
+                "size":len(self.query_cache)
+            }
 
+    @timed("agentos_embedding_encode_seconds","EmbeddingModel encode latency",path="documents")
     def encode(
         self,
         data:List[BaseData]
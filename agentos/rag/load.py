@@ -1,14 +1,6 @@
-import sys
-import os
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(current_dir))
-sys.path.insert(0, project_root)
-
-
 import csv
 from io import StringIO
 from pathlib import Path
-from pypdf import PdfReader
 from agentos.rag.data import JsonData,TextData,PdfData,CsvData
    
    
@@ -28,6 +20,7 @@ def json_load(file_path,**kwargs):
     return JsonData(content,encoding)
 
 def pdf_load(file_path,**kwargs):  
+    from pypdf import PdfReader
     reader = PdfReader(file_path)
     number_of_pages = len(reader.pages)
     #page = reader.pages[0]
@@ -85,6 +78,39 @@ def csv_load(file_path, **kwargs):
     return CsvData(content, encoding)
 
 
+def csv_rows_iter(file_path, **kwargs):
+    """Yield one CsvData per row; every column is also stored as metadata.
+
+    column_types maps a header to a type (e.g. {"年龄(岁)": int}) so metadata
+    can be range-filtered; other columns stay str.
+    """
+    encoding = kwargs.get('encoding')
+    column_types = kwargs.get('column_types') or {}
+
+    with open(file_path, 'r', encoding=encoding) as f:
+        reader = csv.reader(f)
+        headers = next(reader, [])
+        
+        for row in reader:
+            if not row:
+                continue
+            content_buffer = StringIO()
+            csv.writer(content_buffer).writerow([f"{header}:{value}" for header, value in zip(headers, row)])
+            data = CsvData(content_buffer.getvalue().rstrip('\r\n'), encoding)
+            for header, value in zip(headers, row):
+                cast = column_types.get(header, str)
+                try:
+                    data.add_metadata(header, cast(value))
+                except ValueError:
+                    data.add_metadata(header, value)
+            yield data
+
+
+def csv_rows_load(file_path, **kwargs):
+    """One CsvData per row, see csv_rows_iter."""
+    return list(csv_rows_iter(file_path, **kwargs))
+
+
 load_fun_dict={
     ".txt":text_load,
     ".json":json_load,
@@ -98,14 +124,24 @@ class DataLoader:
         self,
         file_path:str,
         encoding:str = "utf-8", #for [text_load,json_load]
+        row_mode:bool = False, #csv only: one record per row with columns as metadata
+        column_types:dict = None, #for row_mode, e.g. {"年龄(岁)": int}
     ):
         self.file_path=file_path
         self.encoding=encoding
+        self.row_mode=row_mode
+        self.column_types=column_types
     
     def load_data(
         self
     ):
         file_suffix = Path(self.file_path).suffix
+        if self.row_mode and file_suffix == ".csv":
+            return csv_rows_load(
+                file_path=self.file_path,
+                encoding=self.encoding,
+                column_types=self.column_types
+            )
         data=load_fun_dict[file_suffix](
             file_path=self.file_path,
             encoding=self.encoding
@@ -0,0 +1,188 @@
+import os
+import numpy as np
+from typing import List
+
+DEFAULT_ONNX_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "agentos", "onnx")
+
+
+def export_onnx(
+    model_name:str,
+    kind:str="embedding",
+    cache_dir:str=None,
+    onnx_dir:str=None,
+    quantize:bool=True
+):
+    """Export a Hugging Face encoder to ONNX (optionally dynamic int8) and cache it on disk.
+
+    Args:
+       model_name: The Hugging Face model name, e.g. "BAAI/bge-base-zh-v1.5".
+       kind: "embedding" (last_hidden_state) or "cross-encoder" (logits).
+       cache_dir: The Hugging Face download cache.
+       onnx_dir: Where exported models are kept, ~/.cache/agentos/onnx by default.
+       quantize: Whether to apply dynamic int8 weight quantization.
+
+    Return:
+        (path to the .onnx file, directory holding the tokenizer)
+    """
+    model_dir=os.path.join(onnx_dir or DEFAULT_ONNX_CACHE,model_name.replace("/","--"))
+    fp32_path=os.path.join(model_dir,"model.onnx")
+    int8_path=os.path.join(model_dir,"model.int8.onnx")
+    path=int8_path if quantize else fp32_path
+    if os.path.exists(path):
+        return path,model_dir
+
+    import torch
+    from transformers import AutoTokenizer,AutoModel,AutoModelForSequenceClassification
+
+    os.makedirs(model_dir,exist_ok=True)
+    tokenizer=AutoTokenizer.from_pretrained(model_name,cache_dir=cache_dir)
+    tokenizer.save_pretrained(model_dir)
+
+    if not os.path.exists(fp32_path):
+        auto_cls=AutoModelForSequenceClassification if kind=="cross-encoder" else AutoModel
+        model=auto_cls.from_pretrained(model_name,cache_dir=cache_dir).eval()
+        dummy=tokenizer(["体检", "health check"],padding=True,return_tensors="pt")
+        input_names=list(dummy.keys())
+        output_name="logits" if kind=="cross-encoder" else "last_hidden_state"
+
+        class FirstOutput(torch.nn.Module):
+            def __init__(self, model):
+                super().__init__()
+                self.model=model
+
+            def forward(self, *inputs):
+                return self.model(**dict(zip(input_names,inputs)))[0]
+
+        dynamic_axes={name:{0:"batch",1:"sequence"} for name in input_names}
+        dynamic_axes[output_name]={0:"batch"} if kind=="cross-encoder" else {0:"batch",1:"sequence"}
+        with torch.no_grad():
+            torch.onnx.export(
+                FirstOutput(model),
+                tuple(dummy[name] for name in input_names),
+                fp32_path,
+                input_names=input_names,
+                output_names=[output_name],
+                dynamic_axes=dynamic_axes,
+                opset_version=14
+            )
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic,QuantType
+        quantize_dynamic(fp32_path,int8_path,weight_type=QuantType.QInt8)
+    return path,model_dir
+
+
+class OnnxModel:
+    def __init__(
+        self,
+        model_name:str,
+        kind:str,
+        cache_dir:str=None,
+        onnx_dir:str=None,
+        quantize:bool=True,
+        max_length:int=512,
+        num_threads:int=None
+    ):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        path,model_dir=export_onnx(model_name,kind,cache_dir,onnx_dir,quantize)
+        options=onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads=num_threads
+        self.session=onnxruntime.InferenceSession(path,options,providers=["CPUExecutionProvider"])
+        self.input_names=[i.name for i in self.session.get_inputs()]
+        self.tokenizer=AutoTokenizer.from_pretrained(model_dir)
+        self.max_length=max_length
+
+    def forward(
+        self,
+        *texts
+    ):
+        features=self.tokenizer(*texts,padding=True,truncation=True,max_length=self.max_length,return_tensors="np")
+        inputs={name:features[name].astype(np.int64) for name in self.input_names}
+        return self.session.run(None,inputs)[0],features["attention_mask"]
+
+
+class OnnxEncoder(OnnxModel):
+    """ONNX Runtime stand-in for SentenceTransformer.encode."""
+    def __init__(
+        self,
+        model_name:str,
+        cache_dir:str=None,
+        pooling:str="cls",
+        normalize:bool=True,
+        **kwargs
+    ):
+        # bge models use CLS pooling followed by L2 normalization
+        super().__init__(model_name,"embedding",cache_dir,**kwargs)
+        self.pooling=pooling
+        self.normalize=normalize
+
+    def encode(
+        self,
+        sentences,
+        batch_size:int=32,
+        **kwargs
+    ):
+        single=isinstance(sentences,str)
+        if single:
+            sentences=[sentences]
+        sentences=list(sentences)
+        outputs=[]
+        for begin in range(0,len(sentences),batch_size):
+            hidden,mask=self.forward(sentences[begin:begin+batch_size])
+            if self.pooling=="cls":
+                emb=hidden[:,0]
+            else:
+                mask=mask[...,None].astype(hidden.dtype)
+                emb=(hidden*mask).sum(axis=1)/np.clip(mask.sum(axis=1),1e-9,None)
+            if self.normalize:
+                emb=emb/np.clip(np.linalg.norm(emb,axis=1,keepdims=True),1e-12,None)
+            outputs.append(emb.astype(np.float32))
+        embeddings=np.concatenate(outputs) if outputs else np.zeros((0,0),dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+
+class OnnxCrossEncoder(OnnxModel):
+    """ONNX Runtime stand-in for sentence_transformers CrossEncoder.predict/rank."""
+    def __init__(
+        self,
+        model_name:str,
+        cache_dir:str=None,
+        **kwargs
+    ):
+        super().__init__(model_name,"cross-encoder",cache_dir,**kwargs)
+
+    def predict(
+        self,
+        sentence_pairs:List[List[str]],
+        batch_size:int=32
+    ):
+        scores=[]
+        for begin in range(0,len(sentence_pairs),batch_size):
+            batch=sentence_pairs[begin:begin+batch_size]
+            logits,_=self.forward([p[0] for p in batch],[p[1] for p in batch])
+            if logits.shape[1]==1:
+                # same default activation as CrossEncoder for single-label models
+                scores.append(1/(1+np.exp(-logits[:,0])))
+            else:
+                scores.append(logits)
+        return np.concatenate(scores) if scores else np.zeros(0)
+
+    def rank(
+        self,
+        query:str,
+        documents:List[str],
+        return_documents:bool=False,
+        top_k:int=None
+    ):
+        scores=self.predict([[query,doc] for doc in documents])
+        results=[]
+        for i,score in enumerate(scores):
+            result={"corpus_id":i,"score":float(score)}
+            if return_documents:
+                result["text"]=documents[i]
+            results.append(result)
+        results.sort(key=lambda r:r["score"],reverse=True)
+        return results[:top_k] if top_k else results
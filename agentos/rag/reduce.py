@@ -0,0 +1,90 @@
+import os
+
+# numpy is imported inside the methods so that loading a full-dimensional store does not import it
+PROJECTION_FILE = "projection.npz"
+
+
+class Projection:
+    def __init__(
+        self,
+        components=None,
+        mean=None,
+        dim:int=None,
+        method:str="pca"
+    ):
+        """Reduce embeddings to `dim` dimensions and re-normalize them to unit length.
+
+        Args:
+           components: (dim, input_dim) principal axes, used by method "pca".
+           mean: (input_dim,) mean of the fitted embeddings, used by method "pca".
+           dim: The output dimension.
+           method: "pca", or "truncate" to keep the first `dim` coordinates
+              (only meaningful for Matryoshka-trained models).
+        """
+        import numpy as np
+        if method not in ("pca","truncate"):
+            raise ValueError(f"unknown projection method {method!r}")
+        self.method=method
+        self.components=None if components is None else np.asarray(components,dtype=np.float32)
+        self.mean=None if mean is None else np.asarray(mean,dtype=np.float32)
+        self.dim=dim if dim is not None else len(self.components)
+
+    @classmethod
+    def fit(
+        cls,
+        embeddings,
+        dim:int,
+        method:str="pca"
+    ):
+        """Fit a projection on the embeddings of the documents being ingested."""
+        if method=="truncate":
+            return cls(dim=dim,method="truncate")
+        import numpy as np
+        x=np.asarray(embeddings,dtype=np.float64)
+        if dim>x.shape[1]:
+            raise ValueError(f"cannot reduce {x.shape[1]}-dim embeddings to {dim}")
+        mean=x.mean(axis=0)
+        centered=x-mean
+        # eigen-decompose the (input_dim x input_dim) covariance instead of an SVD of the data
+        _,vectors=np.linalg.eigh(centered.T@centered)
+        components=vectors[:,::-1][:,:dim].T
+        return cls(components,mean,dim,"pca")
+
+    def __call__(
+        self,
+        embeddings
+    ):
+        import numpy as np
+        x=np.asarray(embeddings,dtype=np.float32)
+        if self.method=="truncate":
+            y=x[:,:self.dim]
+        else:
+            y=(x-self.mean)@self.components.T
+        norms=np.linalg.norm(y,axis=1,keepdims=True)
+        return y/np.maximum(norms,1e-12)
+
+    def save(
+        self,
+        dir:str
+    ):
+        import numpy as np
+        arrays={"dim":np.array(self.dim),"method":np.array(self.method)}
+        if self.method=="pca":
+            arrays.update(components=self.components,mean=self.mean)
+        np.savez(os.path.join(dir,PROJECTION_FILE),**arrays)
+
+    @classmethod
+    def load(
+        cls,
+        dir:str
+    ):
+        """Load the projection persisted with a store, or None if the store is full-dimensional."""
+        path=os.path.join(dir,PROJECTION_FILE)
+        if not os.path.exists(path):
+            return None
+        import numpy as np
+        with np.load(path) as f:
+            method=str(f["method"])
+            if method=="truncate":
+                return cls(dim=int(f["dim"]),method=method)
+            return cls(f["components"],f["mean"],int(f["dim"]),method)
@@ -1,15 +1,8 @@
-import sys
-import os
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(current_dir))
-sys.path.insert(0, project_root)
-
-
 #from flashrank import Ranker, RerankRequest
 #from BCEmbedding import RerankerModel #https://huggingface.co/maidalun1020/bce-reranker-base_v1
 from typing import List
 from agentos.rag.data import BaseData,PdfData,TextData,JsonData,CsvData,merge_content
-from sentence_transformers.cross_encoder import CrossEncoder
+from agentos.utils.metrics import timed
 
  
 
@@ -18,12 +11,21 @@ class Rerank:
         self,
         model_name:str,
         cache_dir:str=None,
+        backend:str="torch",
         **kwargs
     ):
         # cross-encoder/ms-marco-MiniLM-L6-v2
         # cache_folder="/mnt/7T/xz"
-        self.ranker = CrossEncoder(model_name=model_name,cache_dir=cache_dir,**kwargs)
+        # backend: "torch" (sentence-transformers) or "onnx" (ONNX Runtime, int8 quantized by default)
+        self.backend=backend
+        if backend=="onnx":
+            from agentos.rag.onnx_backend import OnnxCrossEncoder
+            self.ranker = OnnxCrossEncoder(model_name,cache_dir=cache_dir,**kwargs)
+        else:
+            from sentence_transformers.cross_encoder import CrossEncoder
+            self.ranker = CrossEncoder(model_name=model_name,cache_dir=cache_dir,**kwargs)
     
+    @timed("agentos_rerank_seconds","Rerank.rerank latency")
     def rerank(
         self,
         query:str,
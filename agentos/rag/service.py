@@ -0,0 +1,221 @@
+import os
+import json
+import socket
+import socketserver
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict,List
+from agentos.rag.data import BaseData
+
+
+def parse_address(
+    address:str
+):
+    """Parse "host:port" or "unix:/path/to.sock"."""
+    if address.startswith("unix:"):
+        return "unix",address[len("unix:"):]
+    host,port=address.rsplit(":",1)
+    return "tcp",(host,int(port))
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(
+        self,
+        path:str,
+        timeout:float=None
+    ):
+        super().__init__("localhost",timeout=timeout)
+        self.path=path
+
+    def connect(self):
+        self.sock=socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn,socketserver.UnixStreamServer):
+    daemon_threads=True
+
+    def get_request(self):
+        request,_=super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        return request,("unix",0)
+
+
+class RetrievalServer:
+    def __init__(
+        self,
+        embedding_model,
+        stores:Dict,
+        reranker=None
+    ):
+        """Serve one EmbeddingModel, Rerank and a set of ChromaDB stores to other processes.
+
+        Args:
+           embedding_model: The shared embedding model.
+           stores: The stores to expose, keyed by name, e.g. {"v1": v1, "v2": v2}.
+           reranker: The shared reranker, used when a query asks for rerank.
+        """
+        self.embedding_model=embedding_model
+        self.stores=stores
+        self.reranker=reranker
+
+    def handle(
+        self,
+        path:str,
+        body:Dict
+    ):
+        if path=="/encode":
+            embeddings=self.embedding_model(body["texts"])
+            return {"embeddings":[[float(x) for x in e] for e in embeddings]}
+        if path=="/query":
+            results=self.stores[body["store"]].query_data(
+                body["query_text"],
+                query_num=body.get("query_num",10),
+                rerank=body.get("rerank",False),
+                reranker=self.reranker,
+                where=body.get("where")
+            )
+            return {"results":[{"content":r.get_content(),"metadata":r.get_metadata()} for r in results]}
+        if path=="/rerank":
+            results=self.reranker.rerank(body["query"],body["passages"])
+            return {"results":[{"corpus_id":int(r["corpus_id"]),"score":float(r["score"]),"text":r["text"]} for r in results]}
+        raise KeyError(path)
+
+    def make_handler(self):
+        server=self
+
+        class RetrievalHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length=int(self.headers.get("Content-Length",0))
+                try:
+                    body=json.loads(self.rfile.read(length) or b"{}")
+                    payload=json.dumps(server.handle(self.path,body),ensure_ascii=False).encode("utf-8")
+                    status=200
+                except KeyError as e:
+                    payload=json.dumps({"error":f"unknown {e}"}).encode("utf-8")
+                    status=404
+                except Exception as e:
+                    payload=json.dumps({"error":str(e)}).encode("utf-8")
+                    status=500
+                self.send_response(status)
+                self.send_header("Content-Type","application/json")
+                self.send_header("Content-Length",str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self,format,*args):
+                pass
+
+        return RetrievalHandler
+
+    def serve(
+        self,
+        address:str="127.0.0.1:8600"
+    ):
+        """Block and serve on "host:port" or "unix:/path/to.sock"."""
+        kind,addr=parse_address(address)
+        if kind=="unix":
+            if os.path.exists(addr):
+                os.remove(addr)
+            httpd=ThreadingUnixHTTPServer(addr,self.make_handler())
+        else:
+            httpd=ThreadingHTTPServer(addr,self.make_handler())
+        try:
+            httpd.serve_forever()
+        finally:
+            httpd.server_close()
+
+
+class RetrievalClient:
+    def __init__(
+        self,
+        address:str="127.0.0.1:8600",
+        timeout:float=60
+    ):
+        self.address=address
+        self.timeout=timeout
+        self.kind,self.addr=parse_address(address)
+
+    def post(
+        self,
+        path:str,
+        body:Dict
+    ):
+        if self.kind=="unix":
+            conn=UnixHTTPConnection(self.addr,timeout=self.timeout)
+        else:
+            conn=http.client.HTTPConnection(*self.addr,timeout=self.timeout)
+        try:
+            conn.request("POST",path,body=json.dumps(body,ensure_ascii=False).encode("utf-8"),headers={"Content-Type":"application/json"})
+            response=conn.getresponse()
+            data=json.loads(response.read())
+        finally:
+            conn.close()
+        if response.status!=200:
+            raise RuntimeError(f"retrieval service {path} failed: {data.get('error')}")
+        return data
+
+
+class RemoteEmbeddingModel:
+    """Drop-in for EmbeddingModel backed by a RetrievalServer."""
+    def __init__(
+        self,
+        address:str="127.0.0.1:8600"
+    ):
+        self.client=RetrievalClient(address)
+
+    def __call__(self, input:List[str]):
+        return self.client.post("/encode",{"texts":list(input)})["embeddings"]
+
+    def encode(
+        self,
+        data:List[BaseData]
+    ):
+        return self(d.get_content() for d in data)
+
+
+class RemoteRerank:
+    """Drop-in for Rerank backed by a RetrievalServer."""
+    def __init__(
+        self,
+        address:str="127.0.0.1:8600"
+    ):
+        self.client=RetrievalClient(address)
+
+    def rerank(
+        self,
+        query:str,
+        passages:List[str],
+    ):
+        return self.client.post("/rerank",{"query":query,"passages":passages})["results"]
+
+
+class RemoteChromaDB:
+    """Drop-in for ChromaDB.query_data backed by a named store of a RetrievalServer."""
+    def __init__(
+        self,
+        address:str,
+        store:str
+    ):
+        self.client=RetrievalClient(address)
+        self.store=store
+
+    def query_data(
+        self,
+        query_text:str,
+        query_num:int=10,
+        rerank:bool=False,
+        reranker=None,
+        where:Dict=None
+    )->List[BaseData]:
+        # reranking always uses the server's reranker
+        res=self.client.post("/query",{
+            "store":self.store,
+            "query_text":query_text,
+            "query_num":query_num,
+            "rerank":rerank,
+            "where":where
+        })
+        return [BaseData(r["content"],r["metadata"]) for r in res["results"]]
@@ -1,11 +1,5 @@
-import sys
-import os
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(current_dir))
-sys.path.insert(0, project_root)
-
-
-from agentos.rag.data import BaseData
+import re
+from agentos.rag.data import BaseData,ChunkBatch
 from typing import List
  
  
@@ -21,11 +15,10 @@ class CharacterSplit:
     def split(
         self,
         data:BaseData
-    )->List[BaseData]:
+    )->ChunkBatch:
         
-        meta_data=data.get_metadata()
         content = data.get_content()
-        chunk_res = []
+        chunk_res = ChunkBatch(content,data.get_metadata())
 
         i = 0
         while i < len(content):
@@ -36,7 +29,7 @@ class CharacterSplit:
             end = min(start + self.chunk_size, len(content))   
 
            
-            chunk_res.append(BaseData(content=content[start:end],metadata=meta_data))
+            chunk_res.append(start,end)
             
             i = end
             
@@ -57,17 +50,95 @@ class RowSplit:
     def split(
         self,
         data:BaseData
-    )->List[BaseData]:
+    )->ChunkBatch:
         
-        meta_data=data.get_metadata()
-        content = data.get_content().split('\n')
-        chunk_res = []
+        content = data.get_content()
+        chunk_res = ChunkBatch(content,data.get_metadata())
+
+        # row offsets instead of split('\n') copies; a chunk of rows is one contiguous span
+        newlines = [m.start() for m in re.finditer('\n',content)]
+        row_starts = [0]+[n+1 for n in newlines]
+        row_ends = newlines+[len(content)]
 
         begin = 0
-        while begin < len(content):
-            end = min(begin + self.chunk_row_size, len(content))   
-            chunk_res.append(BaseData(content='\n'.join(content[begin:end]),metadata=meta_data))
+        while begin < len(row_starts):
+            end = min(begin + self.chunk_row_size, len(row_starts))   
+            chunk_res.append(row_starts[begin],row_ends[end-1])
             begin=begin+self.chunk_row_size-self.chunk_overlap
         
         return chunk_res
 
+
+
+class SentenceSplit:
+    # Chinese and ASCII sentence terminators; a closing quote/bracket stays with its sentence
+    sentence_end = re.compile(r'[。！？；!?;]+[”’"\')）】]*')
+
+    def __init__(
+        self,
+        chunk_token_size:int=256,
+        tokenizer=None
+    ):
+        """Pack whole sentences into chunks of at most chunk_token_size tokens.
+
+        Args:
+           chunk_token_size: The token budget of one chunk.
+           tokenizer: The embedding model's tokenizer (anything with tokenize(text)),
+              e.g. EmbeddingModel.embedding_model.tokenizer. Characters are counted when None.
+        """
+        self.chunk_token_size=chunk_token_size
+        self.tokenizer=tokenizer
+
+    def count_tokens(
+        self,
+        text:str
+    )->int:
+        if self.tokenizer is None:
+            return len(text)
+        return len(self.tokenizer.tokenize(text))
+
+    def sentence_spans(
+        self,
+        content:str
+    )->List[tuple]:
+        res=[]
+        begin=0
+        for m in self.sentence_end.finditer(content):
+            res.append((begin,m.end()))
+            begin=m.end()
+        if begin<len(content):
+            res.append((begin,len(content)))
+        return res
+
+    def split(
+        self,
+        data:BaseData
+    )->ChunkBatch:
+        
+        content = data.get_content()
+        chunk_res = ChunkBatch(content,data.get_metadata())
+
+        chunk_start=0
+        chunk_end=0
+        chunk_tokens=0
+        for start,end in self.sentence_spans(content):
+            tokens=self.count_tokens(content[start:end])
+            if chunk_end>chunk_start and chunk_tokens+tokens>self.chunk_token_size:
+                chunk_res.append(chunk_start,chunk_end)
+                chunk_start=start
+                chunk_tokens=0
+            if tokens>self.chunk_token_size:
+                # a single over-long sentence is cut by characters in proportion to its token count,
+                # its tail is packed together with the following sentences
+                step=max((end-start)*self.chunk_token_size//tokens,1)
+                while end-start>step:
+                    chunk_res.append(start,start+step)
+                    start+=step
+                chunk_start=start
+                tokens=self.count_tokens(content[start:end])
+            chunk_end=end
+            chunk_tokens+=tokens
+        if chunk_end>chunk_start:
+            chunk_res.append(chunk_start,chunk_end)
+
+        return chunk_res
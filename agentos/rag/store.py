@@ -1,18 +1,26 @@
 import sys
-import os
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(current_dir))
-sys.path.insert(0, project_root)
-
-
 import uuid
+import sqlite3
 import warnings
-import chromadb
-from agentos.rag.data import BaseData,PdfData,TextData,JsonData,CsvData,merge_content
-from agentos.rag.rerank import *
-from agentos.rag.embedding import *
-from chromadb.api import ClientAPI
-from chromadb.api.models.Collection import Collection
+from typing import Dict,List
+from agentos.rag.data import BaseData,PdfData,TextData,JsonData,CsvData,ChunkBatch,merge_content
+from agentos.rag.embedding import EmbeddingModel
+from agentos.rag.reduce import Projection
+from agentos.utils.metrics import timed
+
+
+def import_chromadb():
+    """Import chromadb on first use, swapping in pysqlite3 only when the system sqlite3 is too old for it."""
+    if "chromadb" not in sys.modules and sqlite3.sqlite_version_info<(3,35,0):
+        try:
+            __import__("pysqlite3")
+            sys.modules["sqlite3"]=sys.modules.pop("pysqlite3")
+        except ImportError:
+            pass
+    import chromadb
+    return chromadb
+
+
  
 
 
@@ -22,13 +30,18 @@ class ChromaDB():
     collection_name = "agentos"
     def __init__(
         self,
-        chroma_client:ClientAPI,
-        collection:Collection,
-        embedding_model:EmbeddingModel
+        chroma_client,
+        collection,
+        embedding_model:EmbeddingModel,
+        dir:str=None,
+        projection:Projection=None
     ):
         self.chroma_client=chroma_client
         self.collection=collection
         self.embedding_model=embedding_model
+        self.dir=dir
+        # stored vectors are reduced by this projection; queries are reduced the same way
+        self.projection=projection
     
 
     @classmethod
@@ -40,6 +53,7 @@ class ChromaDB():
         """Load Chromadb from exist dir.
  
         """
+        chromadb = import_chromadb()
         chroma_client = chromadb.PersistentClient(path=dir) 
         collection = chroma_client.get_collection(name=cls.collection_name, embedding_function=embedding_model)
            
@@ -47,6 +61,8 @@ class ChromaDB():
             chroma_client,
             collection,
             embedding_model,
+            dir=dir,
+            projection=Projection.load(dir)
         )
     
 
@@ -56,7 +72,8 @@ class ChromaDB():
         cls,
         embedding_model:EmbeddingModel,
         if_persist:bool=False,
-        dir:str=None
+        dir:str=None,
+        metadata:Dict=None
     ):
         """Create a Chromadb.
 
@@ -65,53 +82,104 @@ class ChromaDB():
            if_persist: Whether persist to disk.
            dir: The dir to persist.
            collection_name: The collection name when create the Chromadb(We stipulate one ChromaDB can only one collection).
+           metadata: The collection metadata, e.g. {"hnsw:space": "cosine"}.
         
         Return:
             A Chromadb instance.
         """
+        chromadb = import_chromadb()
         if if_persist:
             # warnings.warn("You have to make sure there is not a ChromaDB document in the {dir} before call this function,otherwise an unknown error may occur.")
             if not dir:
                 raise("please input the dir you want to persist the document")
             
             chroma_client = chromadb.PersistentClient(path=dir)
-            collection = chroma_client.create_collection(name=cls.collection_name, embedding_function=embedding_model)
+            collection = chroma_client.create_collection(name=cls.collection_name, embedding_function=embedding_model, metadata=metadata)
         else:
             chroma_client = chromadb.Client()
-            collection = chroma_client.create_collection(name=cls.collection_name, embedding_function=embedding_model)
+            collection = chroma_client.create_collection(name=cls.collection_name, embedding_function=embedding_model, metadata=metadata)
 
 
         return cls(
             chroma_client,
             collection,
             embedding_model,
+            dir=dir if if_persist else None
         )
  
      
     
+    def fit_projection(
+        self,
+        embeddings,
+        dim:int,
+        method:str="pca"
+    ):
+        """Reduce the stored vectors to `dim` dimensions; call before the first add_data.
+
+        Args:
+           embeddings: Full-dimensional embeddings of (a sample of) the documents to ingest.
+           dim: The stored dimension, e.g. 128/256/384 for bge-base's 768.
+           method: "pca", or "truncate" for Matryoshka-trained models.
+        """
+        self.projection=Projection.fit(embeddings,dim,method)
+        if self.dir:
+            self.projection.save(self.dir)
+        return self.projection
+
     def add_data(
         self,
         data:List[BaseData],
+        embeddings=None
     ):
-        documents=[d.get_content() for d in data]
-        metadatas=[d.get_metadata() for d in data]
+        """Add documents; embeddings may be precomputed, otherwise they are computed with encode."""
+        if isinstance(data,ChunkBatch):
+            documents=data.contents()
+            metadatas=data.get_metadatas()
+        else:
+            documents=[d.get_content() for d in data]
+            metadatas=[d.get_metadata() for d in data]
+
+        if embeddings is None:
+            # embed documents here: the collection's embedding function is the query path and
+            # would fill the query-embedding cache with documents
+            embeddings=self.embedding_model.encode(data)
+        if self.projection is not None:
+            embeddings=self.projection(embeddings)
+        embeddings=[e.tolist() if hasattr(e,"tolist") else e for e in embeddings]
 
         ids = [str(uuid.uuid4()) for _ in documents]
         self.collection.add(
             documents=documents,
             metadatas=metadatas,
+            embeddings=embeddings,
             ids=ids
         )
     
 
+    @timed("agentos_store_query_seconds","ChromaDB.query_data latency")
     def query_data(
         self,
         query_text:str,
         query_num:int=10,
         rerank:bool=False,
-        reranker=None
+        reranker=None,
+        where:Dict=None
     )->List[BaseData]:
-        query_data=self.collection.query(query_texts=query_text,n_results=query_num)
+        """Query the nearest documents.
+
+        Args:
+           where: Chroma metadata filter applied before vector scoring,
+              e.g. {"$and": [{"性别": "男"}, {"年龄(岁)": {"$gte": 40}}]}.
+        """
+        if self.projection is not None:
+            query={"query_embeddings":self.projection(self.embedding_model([query_text])).tolist()}
+        else:
+            query={"query_texts":query_text}
+        if where:
+            query_data=self.collection.query(**query,n_results=query_num,where=where)
+        else:
+            query_data=self.collection.query(**query,n_results=query_num)
         
         results=[]
         for i in range(len(query_data['metadatas'][0])):
@@ -1 +1,2 @@
-from agentos.utils.utils import *
\ No newline at end of file
+from agentos.utils.utils import *
+from agentos.utils.ratelimit import llm_priority
\ No newline at end of file
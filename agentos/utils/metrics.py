@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+
+# Lightweight counters/histograms for agentos hot paths.
+# Disabled by default (AGENTOS_METRICS=1 or enable() turns them on); when disabled
+# every instrumentation point costs a single flag check.
+
+_enabled = os.environ.get("AGENTOS_METRICS", "0") == "1"
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class Counter:
+    def __init__(
+        self,
+        name:str,
+        help:str=""
+    ):
+        self.name=name
+        self.help=help
+        self.values={}
+        self.lock=threading.Lock()
+
+    def inc(self, amount:float=1, **labels):
+        if not _enabled:
+            return
+        key=_label_key(labels)
+        with self.lock:
+            self.values[key]=self.values.get(key,0)+amount
+
+    def to_prometheus(self):
+        lines=[f"# HELP {self.name} {self.help}",f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key,value in self.values.items():
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+    def snapshot(self):
+        with self.lock:
+            return [{"labels":dict(key),"value":value} for key,value in self.values.items()]
+
+
+class Histogram:
+    def __init__(
+        self,
+        name:str,
+        help:str="",
+        buckets=DEFAULT_BUCKETS
+    ):
+        self.name=name
+        self.help=help
+        self.buckets=tuple(buckets)
+        self.series={}
+        self.lock=threading.Lock()
+
+    def observe(self, value:float, **labels):
+        if not _enabled:
+            return
+        key=_label_key(labels)
+        index=bisect.bisect_left(self.buckets,value)
+        with self.lock:
+            series=self.series.get(key)
+            if series is None:
+                series=self.series[key]={"counts":[0]*(len(self.buckets)+1),"sum":0.0,"count":0}
+            series["counts"][index]+=1
+            series["sum"]+=value
+            series["count"]+=1
+
+    def time(self, **labels):
+        return Timer(self,labels)
+
+    def to_prometheus(self):
+        lines=[f"# HELP {self.name} {self.help}",f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key,series in self.series.items():
+                cumulative=0
+                for bound,count in zip(self.buckets+("+Inf",),series["counts"]):
+                    cumulative+=count
+                    lines.append(f"{self.name}_bucket{_format_labels(key,[('le',bound)])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {"labels":dict(key),"count":s["count"],"sum":s["sum"],"buckets":dict(zip([str(b) for b in self.buckets+("+Inf",)],s["counts"]))}
+                for key,s in self.series.items()
+            ]
+
+
+class Timer:
+    """Context manager and decorator observing elapsed seconds into a histogram."""
+    def __init__(
+        self,
+        histogram:Histogram,
+        labels:dict=None
+    ):
+        self.histogram=histogram
+        self.labels=labels or {}
+        self.start=None
+
+    def __enter__(self):
+        if _enabled:
+            self.start=time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.start is not None:
+            self.histogram.observe(time.perf_counter()-self.start,**self.labels)
+            self.start=None
+        return False
+
+    def __call__(self, func):
+        histogram,labels=self.histogram,self.labels
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start=time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter()-start,**labels)
+        return wrapper
+
+
+class Registry:
+    def __init__(self):
+        self.metrics={}
+        self.lock=threading.Lock()
+
+    def get_or_create(self, cls, name:str, *args, **kwargs):
+        with self.lock:
+            metric=self.metrics.get(name)
+            if metric is None:
+                metric=self.metrics[name]=cls(name,*args,**kwargs)
+            return metric
+
+    def to_prometheus(self):
+        lines=[]
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.to_prometheus())
+        return "\n".join(lines)+"\n"
+
+    def snapshot(self):
+        return {name:metric.snapshot() for name,metric in list(self.metrics.items())}
+
+
+REGISTRY = Registry()
+
+
+def counter(name:str, help:str=""):
+    return REGISTRY.get_or_create(Counter,name,help)
+
+
+def histogram(name:str, help:str="", buckets=DEFAULT_BUCKETS):
+    return REGISTRY.get_or_create(Histogram,name,help,buckets)
+
+
+def timed(name:str, help:str="", **labels):
+    """Decorator timing every call into the histogram `name`."""
+    return Timer(histogram(name,help),labels)
+
+
+def snapshot_json():
+    return json.dumps(REGISTRY.snapshot(),ensure_ascii=False)
+
+
+def serve_metrics(
+    port:int=9108,
+    host:str="127.0.0.1"
+):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path=="/metrics":
+                body,content_type=REGISTRY.to_prometheus().encode("utf-8"),"text/plain; version=0.0.4"
+            elif self.path=="/metrics.json":
+                body,content_type=snapshot_json().encode("utf-8"),"application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type",content_type)
+            self.send_header("Content-Length",str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server=ThreadingHTTPServer((host,port),MetricsHandler)
+    server.daemon_threads=True
+    threading.Thread(target=server.serve_forever,daemon=True,name="agentos-metrics").start()
+    return server
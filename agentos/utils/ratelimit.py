@@ -0,0 +1,174 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+import contextlib
+from concurrent.futures import Future
+from agentos.utils import metrics
+
+# Client-side flow control for LLM calls: single-flight coalescing of identical
+# in-flight requests and a requests/tokens-per-minute token bucket whose waiters
+# are served in priority order (interactive before batch).
+
+PRIORITIES = {"interactive": 0, "batch": 10}
+
+COALESCED = metrics.counter("agentos_llm_coalesced_total","call_model requests served by an identical in-flight call")
+RATE_LIMIT_WAIT = metrics.histogram("agentos_llm_rate_limit_wait_seconds","Time call_model waited for the rate limiter")
+
+_priority = threading.local()
+
+
+@contextlib.contextmanager
+def llm_priority(priority:str):
+    """Run the LLM calls of this thread at `priority` ("interactive" or "batch")."""
+    previous=getattr(_priority,"value",None)
+    _priority.value=priority
+    try:
+        yield
+    finally:
+        _priority.value=previous
+
+
+def current_priority(priority:str=None):
+    return priority or getattr(_priority,"value",None) or "interactive"
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution."""
+    def __init__(self):
+        self.lock=threading.Lock()
+        self.calls={}
+
+    def do(self, key, fn):
+        with self.lock:
+            future=self.calls.get(key)
+            leader=future is None
+            if leader:
+                future=self.calls[key]=Future()
+        if not leader:
+            COALESCED.inc()
+            return future.result()
+        try:
+            result=fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        per_minute:float
+    ):
+        self.capacity=float(per_minute)
+        self.rate=per_minute/60.0
+        self.level=self.capacity
+        self.updated=time.monotonic()
+
+    def refill(self, now:float):
+        self.level=min(self.capacity,self.level+(now-self.updated)*self.rate)
+        self.updated=now
+
+    def wait_time(self, amount:float):
+        """Seconds until `amount` is available (0 if it already is)."""
+        amount=min(amount,self.capacity)
+        return max(0.0,(amount-self.level)/self.rate)
+
+    def take(self, amount:float):
+        self.level-=min(amount,self.capacity)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        requests_per_minute:float=0,
+        tokens_per_minute:float=0
+    ):
+        """Block callers until both the request and the token bucket allow their call.
+
+        Waiters are served strictly by (priority, arrival): a batch call never
+        overtakes a waiting interactive call. A limit of 0 disables that bucket.
+        """
+        self.requests=TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens=TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.cond=threading.Condition()
+        self.waiters=[]
+        self.sequence=itertools.count()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            float(os.environ.get("AGENTOS_LLM_RPM","0")),
+            float(os.environ.get("AGENTOS_LLM_TPM","0"))
+        )
+
+    def enabled(self):
+        return self.requests is not None or self.tokens is not None
+
+    def acquire(
+        self,
+        tokens:int=0,
+        priority:str=None,
+        timeout:float=None
+    )->bool:
+        """Wait for the call's request and tokens; False if timeout seconds passed first."""
+        priority=current_priority(priority)
+        if not self.enabled():
+            return True
+        start=time.perf_counter()
+        give_up=None if timeout is None else time.monotonic()+timeout
+        entry=(PRIORITIES.get(priority,PRIORITIES["batch"]),next(self.sequence))
+        with self.cond:
+            heapq.heappush(self.waiters,entry)
+            try:
+                while True:
+                    wait=None
+                    now=time.monotonic()
+                    if self.waiters[0]==entry:
+                        wait=0.0
+                        if self.requests is not None:
+                            self.requests.refill(now)
+                            wait=max(wait,self.requests.wait_time(1))
+                        if self.tokens is not None:
+                            self.tokens.refill(now)
+                            wait=max(wait,self.tokens.wait_time(tokens))
+                        if wait==0.0:
+                            if self.requests is not None:
+                                self.requests.take(1)
+                            if self.tokens is not None:
+                                self.tokens.take(tokens)
+                            return True
+                    if give_up is not None:
+                        if now>=give_up:
+                            return False
+                        wait=give_up-now if wait is None else min(wait,give_up-now)
+                    self.cond.wait(timeout=wait)
+            finally:
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+                self.cond.notify_all()
+                RATE_LIMIT_WAIT.observe(time.perf_counter()-start,priority=priority)
+
+    def adjust(
+        self,
+        tokens:int
+    ):
+        """Correct the token bucket once the real usage of a call is known."""
+        if self.tokens is None or not tokens:
+            return
+        with self.cond:
+            self.tokens.refill(time.monotonic())
+            self.tokens.level=min(self.tokens.capacity,self.tokens.level-tokens)
+            self.cond.notify_all()
+
+
+def estimate_tokens(messages, max_completion_tokens:int=512):
+    """Upper-bound estimate: one token per prompt character (CJK text) plus the completion budget."""
+    return sum(len(m["content"]) for m in messages)+max_completion_tokens
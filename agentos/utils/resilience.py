@@ -0,0 +1,349 @@
+import os
+import time
+import queue
+import random
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from agentos.utils import metrics
+
+# Deadlines, jittered exponential retries, hedged requests and model fallback
+# for upstream LLM calls. Every attempt runs on a worker thread so a hung
+# connection can be abandoned once the deadline passes; streamed calls are read
+# on a thread of their own so a stalled stream can be abandoned the same way.
+
+RETRIES = metrics.counter("agentos_llm_retries_total","call_model attempts retried after a retryable error")
+HEDGES = metrics.counter("agentos_llm_hedges_total","Hedged call_model requests fired")
+FALLBACKS = metrics.counter("agentos_llm_fallbacks_total","call_model calls moved to the next model")
+DEADLINES = metrics.counter("agentos_llm_deadline_exceeded_total","call_model calls that ran out of time")
+ABANDONED = metrics.counter("agentos_llm_abandoned_attempts_total","Timed-out call_model attempts left running on a worker")
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = {
+    "Timeout", "TimeoutError", "APITimeoutError", "APIConnectionError",
+    "RateLimitError", "ServiceUnavailableError", "InternalServerError", "ConnectionError",
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+def is_retryable(error:BaseException):
+    """Timeouts, connection errors, 429 and 5xx are retryable; anything else (auth, bad request) is not."""
+    status=getattr(error,"http_status",None) or getattr(error,"status_code",None)
+    if status is None:
+        status=getattr(getattr(error,"response",None),"status_code",None)
+    if isinstance(status,int):
+        return status in RETRYABLE_STATUS
+    return isinstance(error,(TimeoutError,ConnectionError)) or type(error).__name__ in RETRYABLE_NAMES
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per model."""
+    def __init__(
+        self,
+        window:int=200,
+        min_samples:int=20
+    ):
+        self.window=window
+        self.min_samples=min_samples
+        self.samples=collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self.lock=threading.Lock()
+
+    def observe(self, model:str, seconds:float):
+        with self.lock:
+            self.samples[model].append(seconds)
+
+    def quantile(self, model:str, q:float=0.95):
+        """The q-quantile of recent latencies, or None until min_samples calls have completed."""
+        with self.lock:
+            samples=sorted(self.samples[model])
+        if len(samples)<self.min_samples:
+            return None
+        return samples[min(int(q*len(samples)),len(samples)-1)]
+
+
+class CallPolicy:
+    def __init__(
+        self,
+        models:list=None,
+        attempt_timeout:float=60,
+        chunk_timeout:float=30,
+        deadline:float=180,
+        max_retries:int=3,
+        backoff_base:float=0.5,
+        backoff_cap:float=8,
+        hedge:bool=False,
+        hedge_quantile:float=0.95,
+        max_workers:int=16
+    ):
+        """How call_model talks to the provider.
+
+        Args:
+           models: Models to try in order; the next one is used once a model has
+              used up its retries (or fails with a non-retryable error other than auth).
+           attempt_timeout: Seconds before a single attempt (or a stream's first token)
+              is abandoned and retried. The HTTP client should time out at the same
+              point so abandoned attempts free their worker.
+           chunk_timeout: Seconds a stream may stall between two chunks.
+           deadline: Seconds for the whole call, retries and fallbacks included.
+           max_retries: Retries per model after the first attempt.
+           backoff_base, backoff_cap: Full-jitter exponential backoff,
+              sleep ~ U(0, min(cap, base * 2**retry)).
+           hedge: Fire a second identical request when the first has not answered
+              within the model's recent p95 latency (hedge_quantile); the first answer wins.
+        """
+        self.models=models or ["deepseek-ai/DeepSeek-V3"]
+        self.attempt_timeout=attempt_timeout
+        self.chunk_timeout=chunk_timeout
+        self.deadline=deadline
+        self.max_retries=max_retries
+        self.backoff_base=backoff_base
+        self.backoff_cap=backoff_cap
+        self.hedge=hedge
+        self.hedge_quantile=hedge_quantile
+        self.latency=LatencyTracker()
+        self.max_workers=max_workers
+        self.executor=ThreadPoolExecutor(max_workers=max_workers,thread_name_prefix="llm-call")
+        self.stats_lock=threading.Lock()
+        # timed-out attempts that were already running and still hold a worker
+        self.abandoned=0
+        self.counts={"calls":0,"retries":0,"hedges":0,"hedge_wins":0,"fallbacks":0,"deadline_exceeded":0,"abandoned":0}
+
+    @classmethod
+    def from_env(cls):
+        models=[m.strip() for m in os.environ.get("AGENTOS_LLM_MODELS","deepseek-ai/DeepSeek-V3").split(",") if m.strip()]
+        return cls(
+            models=models,
+            attempt_timeout=float(os.environ.get("AGENTOS_LLM_TIMEOUT","60")),
+            chunk_timeout=float(os.environ.get("AGENTOS_LLM_CHUNK_TIMEOUT","30")),
+            deadline=float(os.environ.get("AGENTOS_LLM_DEADLINE","180")),
+            max_retries=int(os.environ.get("AGENTOS_LLM_RETRIES","3")),
+            hedge=os.environ.get("AGENTOS_LLM_HEDGE","0")=="1",
+        )
+
+    def count(self, key:str):
+        with self.stats_lock:
+            self.counts[key]+=1
+
+    def stats(self):
+        with self.stats_lock:
+            return dict(self.counts,abandoned_running=self.abandoned)
+
+    def backoff(self, retry:int):
+        return random.uniform(0,min(self.backoff_cap,self.backoff_base*2**retry))
+
+    def admit(self, admit, end:float):
+        """Wait for admission (e.g. the rate limiter) before an attempt, within the deadline."""
+        if admit is not None and not admit(max(end-time.monotonic(),0)):
+            raise DeadlineExceeded("call_model deadline exceeded waiting for the rate limiter")
+
+    def abandon(self, futures):
+        """Cancel attempts that have not started; count the running ones until they finish."""
+        for future in futures:
+            if future.cancel():
+                continue
+            ABANDONED.inc()
+            with self.stats_lock:
+                self.abandoned+=1
+                self.counts["abandoned"]+=1
+            future.add_done_callback(self.release)
+
+    def release(self, future):
+        with self.stats_lock:
+            self.abandoned-=1
+
+    def attempt(self, fn, model:str, end:float, admit=None):
+        """One attempt, hedged if enabled; raises TimeoutError when it does not answer in time.
+
+        admit(timeout) runs on the caller's thread before the request is submitted, so
+        time spent queued for the rate limiter does not count against attempt_timeout.
+        """
+        self.admit(admit,end)
+        timeout=min(self.attempt_timeout,end-time.monotonic())
+        if timeout<=0:
+            raise DeadlineExceeded("call_model deadline exceeded")
+        start=time.monotonic()
+        futures=[self.executor.submit(fn,model)]
+
+        hedge_delay=self.latency.quantile(model,self.hedge_quantile) if self.hedge else None
+        # no hedging while abandoned attempts hold half the pool
+        if hedge_delay is not None and hedge_delay<timeout and self.abandoned<self.max_workers//2:
+            done,_=wait(futures,timeout=hedge_delay)
+            # a hedge is only fired when the rate limiter admits it right away
+            if not done and (admit is None or admit(0)):
+                HEDGES.inc(model=model)
+                self.count("hedges")
+                futures.append(self.executor.submit(fn,model))
+
+        error=None
+        pending=set(futures)
+        while pending:
+            remaining=start+timeout-time.monotonic()
+            if remaining<=0:
+                break
+            done,pending=wait(pending,timeout=remaining,return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self.latency.observe(model,time.monotonic()-start)
+                    if future is not futures[0]:
+                        self.count("hedge_wins")
+                    self.abandon(pending)
+                    return future.result()
+                error=future.exception()
+        if error is not None and not pending:
+            raise error
+        # abandoned attempts that already started finish in the background; their results are dropped
+        self.abandon(pending)
+        raise TimeoutError(f"{model} did not answer within {timeout:.1f}s")
+
+    def on_error(self, error:Exception):
+        """Whether to "retry" the same model or "fallback" to the next one; auth errors are raised."""
+        if is_retryable(error):
+            return "retry"
+        status=getattr(error,"http_status",None) or getattr(error,"status_code",None)
+        if status in (401,403):
+            raise error
+        return "fallback"
+
+    def give_up(self, end:float, last_error:Exception):
+        if time.monotonic()>=end:
+            DEADLINES.inc()
+            self.count("deadline_exceeded")
+            raise DeadlineExceeded("call_model deadline exceeded") from last_error
+        raise last_error
+
+    def call(self, fn, deadline:float=None, admit=None):
+        """Run fn(model) under the policy and return its result.
+
+        admit(timeout) -> bool is called before every attempt and must return False
+        if it could not admit the request within timeout seconds.
+        """
+        self.count("calls")
+        end=time.monotonic()+(deadline if deadline is not None else self.deadline)
+        last_error=None
+        for index,model in enumerate(self.models):
+            if index:
+                FALLBACKS.inc(model=model)
+                self.count("fallbacks")
+            for retry in range(self.max_retries+1):
+                if retry:
+                    RETRIES.inc(model=model)
+                    self.count("retries")
+                    time.sleep(min(self.backoff(retry-1),max(end-time.monotonic(),0)))
+                try:
+                    return self.attempt(fn,model,end,admit)
+                except DeadlineExceeded as e:
+                    last_error=last_error or e
+                    break
+                except Exception as e:
+                    last_error=e
+                    if self.on_error(e)=="fallback":
+                        break
+            if time.monotonic()>=end:
+                break
+        self.give_up(end,last_error)
+
+    def stream_attempt(self, fn, extract, model:str, end:float, admit=None):
+        """Yield the non-empty extract(chunk) of the stream opened by fn(model).
+
+        The stream is read on its own thread; the first content must arrive within
+        attempt_timeout and each later one within chunk_timeout of the previous, both
+        capped by the deadline. The stream is closed when the generator is.
+        """
+        self.admit(admit,end)
+        items=queue.Queue()
+        stop=threading.Event()
+        opened={}
+
+        def pump():
+            try:
+                stream=opened["stream"]=fn(model)
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    items.put((True,chunk))
+                items.put((False,None))
+            except BaseException as e:
+                items.put((False,e))
+
+        threading.Thread(target=pump,daemon=True,name="llm-stream").start()
+        timeout=self.attempt_timeout
+        last=time.monotonic()
+        try:
+            while True:
+                now=time.monotonic()
+                if now>=end:
+                    raise DeadlineExceeded("call_model deadline exceeded")
+                try:
+                    ok,item=items.get(timeout=max(min(last+timeout,end)-now,0))
+                except queue.Empty:
+                    if time.monotonic()>=end:
+                        raise DeadlineExceeded("call_model deadline exceeded")
+                    raise TimeoutError(f"{model} stream stalled for {timeout:.1f}s")
+                if not ok:
+                    if item is None:
+                        return
+                    raise item
+                content=extract(item)
+                if content:
+                    yield content
+                    # time the consumer spends between chunks does not count as a stall
+                    timeout=self.chunk_timeout
+                    last=time.monotonic()
+        finally:
+            stop.set()
+            # drop the connection instead of reading the remaining tokens
+            stream=opened.get("stream")
+            close=getattr(stream,"close",None) or getattr(getattr(stream,"response",None),"close",None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+
+    def stream(self, fn, extract, deadline:float=None, admit=None):
+        """Stream fn(model) under the policy, yielding the non-empty extract(chunk) values.
+
+        Until the first content has been yielded, a slow first token, a stalled stream or
+        a retryable error is retried and falls back like call(). Afterwards the caller
+        has consumed part of the answer, so they are raised instead.
+        """
+        self.count("calls")
+        end=time.monotonic()+(deadline if deadline is not None else self.deadline)
+        last_error=None
+        started=False
+        for index,model in enumerate(self.models):
+            if index:
+                FALLBACKS.inc(model=model)
+                self.count("fallbacks")
+            for retry in range(self.max_retries+1):
+                if retry:
+                    RETRIES.inc(model=model)
+                    self.count("retries")
+                    time.sleep(min(self.backoff(retry-1),max(end-time.monotonic(),0)))
+                attempt=self.stream_attempt(fn,extract,model,end,admit)
+                try:
+                    for content in attempt:
+                        started=True
+                        yield content
+                    return
+                except DeadlineExceeded as e:
+                    if started:
+                        DEADLINES.inc()
+                        self.count("deadline_exceeded")
+                        raise
+                    last_error=last_error or e
+                    break
+                except Exception as e:
+                    if started:
+                        raise
+                    last_error=e
+                    if self.on_error(e)=="fallback":
+                        break
+                finally:
+                    attempt.close()
+            if time.monotonic()>=end:
+                break
+        self.give_up(end,last_error)
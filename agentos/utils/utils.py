@@ -2,7 +2,7 @@
 # import logging
 # import psutil
 # import subprocess
-from openai import OpenAI
+# from openai import OpenAI
 
 # class ColorFormatter(logging.Formatter):
 #     GREEN = '\033[92m'
@@ -136,18 +136,132 @@ from openai import OpenAI
  
 #     return completion.choices[0].message.content 
  
-from together import Together
+import os
+import json
+import functools
+from agentos.utils.metrics import timed
+from agentos.utils.ratelimit import RateLimiter, SingleFlight, current_priority, estimate_tokens
+from agentos.utils.resilience import CallPolicy
 
-def call_model(messages, api_key: str | None = None):
+DEFAULT_BASE_URL = "https://api.together.xyz/v1"
 
-    client = Together(
+def get_base_url():
+    """OpenAI-compatible endpoint; AGENTOS_LLM_BASE_URL points call_model at e.g. a local mock server."""
+    return os.environ.get("AGENTOS_LLM_BASE_URL", DEFAULT_BASE_URL)
+
+@functools.lru_cache(maxsize=32)
+def get_client(api_key: str | None = None, base_url: str | None = None, timeout: float | None = None, max_retries: int | None = None):
+    """One shared Together client (and its connection pool) per API key and settings."""
+    from together import Together
+    options = {k: v for k, v in {"timeout": timeout, "max_retries": max_retries}.items() if v is not None}
+    return Together(
         api_key=api_key,
-        base_url="https://api.together.xyz/v1",
+        base_url=base_url or get_base_url(),
+        **options,
     )
 
+def get_policy_client(api_key: str | None, policy):
+    """Client for calls made under a CallPolicy: it times out with the policy's attempts,
+    so abandoned attempts free their worker, and leaves retrying to the policy."""
+    return get_client(api_key, get_base_url(), policy.attempt_timeout, 0)
+
+# shared by every thread of the process; AGENTOS_LLM_RPM / AGENTOS_LLM_TPM set the limits
+RATE_LIMITER = RateLimiter.from_env()
+SINGLE_FLIGHT = SingleFlight()
+
+# deadlines/retries/hedging/fallback models; AGENTOS_LLM_MODELS, AGENTOS_LLM_TIMEOUT,
+# AGENTOS_LLM_CHUNK_TIMEOUT, AGENTOS_LLM_DEADLINE, AGENTOS_LLM_RETRIES and
+# AGENTOS_LLM_HEDGE=1 configure it
+CALL_POLICY = CallPolicy.from_env()
+
+def configure_rate_limit(requests_per_minute: float = 0, tokens_per_minute: float = 0):
+    global RATE_LIMITER
+    RATE_LIMITER = RateLimiter(requests_per_minute, tokens_per_minute)
+
+def configure_call_policy(**kwargs):
+    """Replace the call policy, e.g. configure_call_policy(models=[...], hedge=True, deadline=30)."""
+    global CALL_POLICY
+    CALL_POLICY = CallPolicy(**kwargs)
+
+def acquire_rate_limit(messages, priority: str | None = None, max_completion_tokens: int = 512):
+    """Wait for the shared rate limiter before a call made outside call_model/stream_model."""
+    RATE_LIMITER.acquire(estimate_tokens(messages, max_completion_tokens), priority)
+
+@timed("agentos_llm_call_seconds", "call_model latency")
+def call_model(messages, api_key: str | None = None, priority: str | None = None, deadline: float | None = None):
+    """
+    priority: "interactive" (default) or "batch"; see agentos.utils.ratelimit.llm_priority.
+    deadline: seconds for the whole call including retries, hedges and fallback models
+        (default CALL_POLICY.deadline); raises resilience.DeadlineExceeded when it runs out.
+    Identical concurrent requests are sent upstream once and share the answer.
+    """
+    # resolved here: attempts run on the policy's worker threads, which do not see llm_priority
+    priority = current_priority(priority)
+    estimate = estimate_tokens(messages)
+    key = (api_key, get_base_url(), json.dumps(messages, ensure_ascii=False, sort_keys=True))
+    policy, limiter = CALL_POLICY, RATE_LIMITER
+    return SINGLE_FLIGHT.do(key, lambda: policy.call(
+        lambda model: _call_model(messages, api_key, model, estimate, policy, limiter),
+        deadline,
+        admit=lambda timeout: limiter.acquire(estimate, priority, timeout),
+    ))
+
+def _call_model(messages, api_key, model, estimate, policy, limiter):
+
+    client = get_policy_client(api_key, policy)
+
     completion = client.chat.completions.create(
-    model="deepseek-ai/DeepSeek-V3",
+    model=model,
     messages=messages,
     )
+    usage = getattr(completion, "usage", None)
+    if usage is not None and getattr(usage, "total_tokens", None):
+        limiter.adjust(usage.total_tokens - estimate)
+
+    return completion.choices[0].message.content 
+
+def stream_model(messages, api_key: str | None = None, priority: str | None = None, deadline: float | None = None):
+    """Yield the completion's content deltas; closing the generator cancels the request.
+
+    Runs under CALL_POLICY like call_model: the first token must arrive within the attempt
+    timeout and later ones within the chunk timeout, and a stream that fails or stalls
+    before its first delta is retried or moved to the next model.
+    """
+    priority = current_priority(priority)
+    estimate = estimate_tokens(messages)
+    policy, limiter = CALL_POLICY, RATE_LIMITER
+    client = get_policy_client(api_key, policy)
+
+    def open_stream(model):
+        return client.chat.completions.create(
+        model=model,
+        messages=messages,
+        stream=True,
+        )
+
+    usage = {}
+
+    def content(chunk):
+        # the final chunk carries the usage of the whole stream
+        total_tokens = getattr(getattr(chunk, "usage", None), "total_tokens", None)
+        if total_tokens:
+            usage["total_tokens"] = total_tokens
+        return chunk.choices[0].delta.content if chunk.choices else None
+
+    def deltas():
+        received = 0
+        try:
+            for delta in policy.stream(
+                open_stream,
+                content,
+                deadline,
+                admit=lambda timeout: limiter.acquire(estimate, priority, timeout),
+            ):
+                received += len(delta)
+                yield delta
+        finally:
+            # a stream closed early reports no usage: charge the prompt and what was read
+            used = usage.get("total_tokens") or estimate_tokens(messages, 0) + received
+            limiter.adjust(used - estimate)
 
-    return completion.choices[0].message.content 
\ No newline at end of file
+    return deltas()
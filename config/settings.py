@@ -1,4 +1,4 @@
-# import os
+import os
 # from dotenv import load_dotenv
 
 # load_dotenv('.env')
@@ -10,4 +10,42 @@ class Config:
     DATA = {
         "csv": "/data/health_check_data.csv",
         "pdf": "/data/symptoms.pdf"
-    }
\ No newline at end of file
+    }
+    # 共享检索服务地址("127.0.0.1:8600" 或 "unix:/tmp/hcr-retrieval.sock")，为空时各进程自行加载模型
+    RETRIEVAL_SERVICE = os.environ.get("HCR_RETRIEVAL_SERVICE")
+    # 向量模型推理后端："torch" 或 "onnx"(int8量化，适合纯CPU节点)
+    EMBEDDING_BACKEND = os.environ.get("HCR_EMBEDDING_BACKEND", "torch")
+    # 入库时用PCA把768维向量降到该维度(如128/256/384)，0表示保留全部维度
+    VECTOR_DIM = int(os.environ.get("HCR_VECTOR_DIM", "0"))
+    # 推荐模式："direct" 资料完整时并行调用固定工具并只调用一次模型，"agent" 始终使用ReAct循环
+    RECOMMEND_MODE = os.environ.get("HCR_RECOMMEND_MODE", "direct")
+    # ReAct代理流式读取模型输出，函数名和参数到齐后立即调用工具并取消剩余输出
+    AGENT_STREAM_REASON = os.environ.get("HCR_AGENT_STREAM_REASON", "1") == "1"
+    # 聊天页会话存储：发送给模型的历史token预算、每个会话保留的token上限、
+    # 所有会话的token总上限、空闲会话淘汰时间(秒)，token数用 CHAT_TOKENIZER 的分词器计算
+    # (可设为本地分词器路径；分词器无法加载时按字符数估算)
+    CHAT_TOKENIZER = os.environ.get("HCR_CHAT_TOKENIZER", "deepseek-ai/DeepSeek-V3")
+    CHAT_HISTORY_TOKENS = 2000
+    CHAT_SESSION_TOKENS = 8000
+    CHAT_TOTAL_TOKENS = 4_000_000
+    CHAT_IDLE_TTL = 1800
+    # 每个会话保留的最近回复统计(TTFT、tokens/s)条数
+    CHAT_REPLY_STATS = 50
+    # 查询向量LRU缓存条数，以及启动时从历史记录库预热的最常见查询条数(0表示不预热)
+    QUERY_CACHE_SIZE = 1024
+    QUERY_CACHE_WARMUP = int(os.environ.get("HCR_QUERY_CACHE_WARMUP", "0"))
+    HISTORY_DB_PATH = "history.db"
+    # 向量库查询线程池大小(并发会话的检索并行执行，嵌入由微批处理合并)
+    STORE_QUERY_WORKERS = 4
+    # 查询向量的微批处理：最多合并的文本数和首个请求最长等待时间(毫秒)
+    EMBEDDING_BATCH_SIZE = 32
+    EMBEDDING_BATCH_WAIT_MS = 5
+    # 医院查询：Overpass地址(也可以是本地替身服务的地址或Overpass格式的JSON文件路径)
+    OVERPASS_URL = os.environ.get("HCR_OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+    HOSPITAL_CACHE_PATH = "/.cache/hospitals"
+    HOSPITAL_CACHE_TTL = 7 * 24 * 3600
+    HOSPITAL_MAX_RADIUS = 50000
+    GEOCODE_CACHE_PATH = "/.cache/geocode"
+    GEOCODE_CACHE_TTL = 30 * 24 * 3600
+    # 离线医院空间索引(由 python src/hospital_index.py 构建)
+    HOSPITAL_INDEX_PATH = "/data/hospital_index.joblib"
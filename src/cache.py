@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class DiskCache:
+    """
+    基于JSON文件的磁盘缓存，每个键对应一个文件，超过ttl(秒)的条目视为过期。
+    读到过期条目时删除其文件；每写入sweep_every次清理一次目录：删除过期文件，
+    文件数超过max_entries时再按写入时间删除最旧的文件
+    """
+    def __init__(self, cache_dir: str, ttl: float | None = None, max_entries: int = 10000, sweep_every: int = 100):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sweep_every = sweep_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str):
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name + ".json")
+
+    def get_entry(self, key: str):
+        """读取缓存，返回(写入时间, 值)，不存在或已过期时返回None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl is not None and time.time() - entry["time"] > self.ttl:
+            self._remove(path)
+            return None
+        return entry["time"], entry["value"]
+
+    def get(self, key: str, default=None):
+        """读取缓存，不存在或已过期时返回default"""
+        entry = self.get_entry(key)
+        return default if entry is None else entry[1]
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def sweep(self):
+        """删除过期的缓存文件，并把文件数限制在max_entries以内"""
+        now = time.time()
+        files = []
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                if not item.name.endswith(".json"):
+                    continue
+                try:
+                    mtime = item.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                # 文件修改时间即写入时间，无需逐个解析JSON
+                if self.ttl is not None and now - mtime > self.ttl:
+                    self._remove(item.path)
+                else:
+                    files.append((mtime, item.path))
+        if len(files) > self.max_entries:
+            files.sort()
+            for _, path in files[:len(files) - self.max_entries]:
+                self._remove(path)
+
+    def set(self, key: str, value):
+        """写入缓存(先写临时文件再替换，避免并发读到半个文件)"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding="utf-8") as f:
+            json.dump({"key": key, "time": time.time(), "value": value}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.sweep_every == 0
+        if due:
+            self.sweep()
+
+    def delete(self, key: str):
+        self._remove(self._path(key))
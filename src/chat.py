@@ -0,0 +1,174 @@
+import time
+import threading
+from collections import OrderedDict, deque
+
+
+class StreamRenderer:
+    """
+    流式回复的节流渲染器：把多个chunk合并后再刷新页面，
+    距上次刷新超过min_interval秒或新增内容超过min_chars个字符时才重新渲染，
+    同时记录首token延迟(TTFT)和生成速度(tokens/s)。
+    """
+    def __init__(
+        self,
+        render,
+        min_interval: float = 0.1,
+        min_chars: int = 64,
+    ):
+        # render(text, done) 负责把当前全文渲染到页面上
+        self.render = render
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+        self.parts = []
+        self.pending_chars = 0
+        self.chunks = 0
+        self.completion_tokens = None
+        self.start_time = time.perf_counter()
+        self.first_token_time = None
+        self.end_time = None
+        self.last_render_time = self.start_time
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def feed(self, content: str):
+        """追加一个chunk，必要时刷新"""
+        if not content:
+            return
+        now = time.perf_counter()
+        if self.first_token_time is None:
+            self.first_token_time = now
+        self.parts.append(content)
+        self.chunks += 1
+        self.pending_chars += len(content)
+        if self.pending_chars >= self.min_chars or now - self.last_render_time >= self.min_interval:
+            self.flush(now)
+
+    def flush(self, now: float | None = None):
+        # 合并已有的片段，避免每次刷新都重复拼接整个列表
+        self.parts = [self.text]
+        self.render(self.parts[0], False)
+        self.pending_chars = 0
+        self.last_render_time = now if now is not None else time.perf_counter()
+
+    def finish(self, completion_tokens: int | None = None):
+        """最后一次完整渲染，返回全文"""
+        self.end_time = time.perf_counter()
+        self.completion_tokens = completion_tokens
+        text = self.text
+        self.render(text, True)
+        return text
+
+    def stats(self):
+        """返回本次回复的TTFT(秒)、token数和tokens/s"""
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        tokens = self.completion_tokens if self.completion_tokens else self.chunks
+        ttft = None if self.first_token_time is None else self.first_token_time - self.start_time
+        generation_time = end_time - (self.first_token_time or self.start_time)
+        return {
+            "ttft": ttft,
+            "tokens": tokens,
+            "tokens_per_sec": tokens / generation_time if generation_time > 0 else None,
+            "total_time": end_time - self.start_time,
+        }
+
+
+class ChatSession:
+    def __init__(self):
+        # 每条消息与其token数一起保存，token只在写入时计算一次
+        self.messages = deque()
+        self.tokens = 0
+        self.last_access = time.monotonic()
+
+
+class ChatSessionStore:
+    """
+    服务端的有界会话存储：所有用户会话共享一个进程内实例。
+    - 每个会话只保留最近 max_session_tokens 个token的消息，window() 按token预算截取发送给模型的历史
+    - 超过 idle_ttl 秒未访问的会话被淘汰
+    - 所有会话的token总数超过 max_total_tokens 时，从最久未访问的会话开始淘汰
+    """
+    def __init__(
+        self,
+        count_tokens,
+        max_session_tokens: int = 8000,
+        max_total_tokens: int = 4_000_000,
+        idle_ttl: float = 1800,
+    ):
+        # count_tokens(text) 用模型的分词器计算token数
+        self.count_tokens = count_tokens
+        self.max_session_tokens = max_session_tokens
+        self.max_total_tokens = max_total_tokens
+        self.idle_ttl = idle_ttl
+        self.sessions = OrderedDict()
+        self.total_tokens = 0
+        self.evicted = 0
+        self.lock = threading.Lock()
+
+    def touch(self, session_id: str, create: bool = False):
+        """取出会话并标记为最近访问，同时淘汰空闲会话(调用方需持有锁)"""
+        now = time.monotonic()
+        while self.sessions:
+            oldest_id, oldest = next(iter(self.sessions.items()))
+            if now - oldest.last_access < self.idle_ttl:
+                break
+            self.drop(oldest_id, evicted=True)
+        session = self.sessions.get(session_id)
+        if session is None and create:
+            session = self.sessions[session_id] = ChatSession()
+        if session is not None:
+            session.last_access = now
+            self.sessions.move_to_end(session_id)
+        return session
+
+    def drop(self, session_id: str, evicted: bool = False):
+        session = self.sessions.pop(session_id)
+        self.total_tokens -= session.tokens
+        if evicted:
+            self.evicted += 1
+
+    def append(self, session_id: str, role: str, content: str):
+        tokens = self.count_tokens(content)
+        with self.lock:
+            session = self.touch(session_id, create=True)
+            session.messages.append(({"role": role, "content": content}, tokens))
+            session.tokens += tokens
+            self.total_tokens += tokens
+            # 单个会话超出上限时丢弃最早的消息(至少保留最新一条)
+            while session.tokens > self.max_session_tokens and len(session.messages) > 1:
+                _, dropped = session.messages.popleft()
+                session.tokens -= dropped
+                self.total_tokens -= dropped
+            # 总量超出上限时淘汰最久未访问的其他会话
+            while self.total_tokens > self.max_total_tokens and len(self.sessions) > 1:
+                self.drop(next(iter(self.sessions)), evicted=True)
+
+    def messages(self, session_id: str):
+        """会话中保留的全部消息(用于页面展示)"""
+        with self.lock:
+            session = self.touch(session_id)
+            return [] if session is None else [m for m, _ in session.messages]
+
+    def window(self, session_id: str, budget: int):
+        """从最新消息往前取，总token数不超过budget的历史(至少包含最新一条)"""
+        with self.lock:
+            session = self.touch(session_id)
+            if session is None:
+                return []
+            selected, used = [], 0
+            for message, tokens in reversed(session.messages):
+                if selected and used + tokens > budget:
+                    break
+                selected.append(message)
+                used += tokens
+        return selected[::-1]
+
+    def clear(self, session_id: str):
+        with self.lock:
+            if session_id in self.sessions:
+                self.drop(session_id)
+
+    def stats(self):
+        with self.lock:
+            return {"sessions": len(self.sessions), "total_tokens": self.total_tokens, "evicted": self.evicted}
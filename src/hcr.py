@@ -17,12 +17,25 @@ from agentos.memory import TemporaryMemory, Message, Role
 from src.tools import *
 from src.prompt import HCR_PROMPT, OUTPUT_PROMPT
 from agentos.utils import call_model
+import re
 import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Config
+
+# 直连模式下 search_by_other 查询的相似病例数
+SIMILAR_CASES = 3
 
 
 # 定义推荐系统类
 class Recommendation:
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, mode: str | None = None):
+        """
+        mode: "direct" 资料完整时并行执行固定的工具计划，只调用一次模型生成推荐；
+              "agent" 始终走ReAct循环。默认取 Config.RECOMMEND_MODE
+        """
+        self.mode = mode or Config.RECOMMEND_MODE
+        self.used_mode = None
         # 初始化代理，配置模型和工具
         self.mediagent = Agent(
             name="mediagent",
@@ -33,9 +46,10 @@ class Recommendation:
                 recommend_by_age(),      # 按年龄推荐工具
                 recommend_by_gender()    # 按性别推荐工具
             ],
-            api_key=api_key
+            api_key=api_key,
+            stream_reason=Config.AGENT_STREAM_REASON   # 流式解析，工具调用完整后立即执行
         )
-        self.conn = sqlite3.connect('history.db')
+        self.conn = sqlite3.connect(Config.HISTORY_DB_PATH)
         self.create_table()
 
     def create_table(self):
@@ -55,13 +69,68 @@ class Recommendation:
         ''')
         self.conn.commit()
 
+    def direct_plan(self, user_info):
+        """
+        资料完整且常规时返回固定的工具调用计划[(工具名, 参数列表)]，否则返回None(交给ReAct代理处理)
+        """
+        try:
+            user_id = str(user_info["id"]).strip()
+            gender = user_info["gender"]
+            age = int(user_info["age"])
+            height = float(str(user_info["height"]).rstrip("cm"))
+            weight = float(str(user_info["weight"]).rstrip("kg"))
+            medical_history = str(user_info["medical_history"]).strip()
+            symptoms = str(user_info["symptoms"]).strip()
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not re.fullmatch(r"\d{6}", user_id) or gender not in ("male", "female"):
+            return None
+        if not (0 < age <= 120 and 0 < height <= 250 and 0 < weight <= 300) or not medical_history or not symptoms:
+            return None
+        other = ",".join(str(user_info[k]) for k in ("gender", "age", "height", "weight", "medical_history", "symptoms"))
+        return [
+            ("search_by_id", [user_id]),
+            ("search_by_other", [SIMILAR_CASES, other]),
+            ("recommend_by_age", [age]),
+            ("recommend_by_gender", [gender]),
+        ]
+
+    def run_direct(self, user_info, plan):
+        """
+        并行执行工具计划，结果按计划顺序以与ReAct相同的格式写入记忆；任一工具出错时返回False
+        (全部工具成功后才写入记忆：PersistentMemory的写入无法撤销，回退到代理时不会重复写入提示词)
+        """
+        memory = self.mediagent.memory
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=len(plan)) as executor:
+                futures = [executor.submit(self.mediagent.call_tool, name, args) for name, args in plan]
+                results = [f.result() for f in futures]
+        except Exception as e:
+            print(f"direct mode failed ({e!r}), falling back to the agent")
+            return False
+        self.mediagent.timings["tool"] += time.perf_counter() - start
+        memory.add_memory(Message(Role.USER, HCR_PROMPT.format(user_info)))
+        for (name, _), result in zip(plan, results):
+            memory.add_memory(Message(Role.USER, "The " + name + " function has been executed and the result is below:\n" + result))
+        return True
+
     def run(self, user_info):
-        # 使用用户信息格式化提示词并运行代理
-        self.mediagent.run(HCR_PROMPT.format(user_info))
+        # 资料完整时直接并行调用工具(省去ReAct的多轮模型调用)，否则使用用户信息格式化提示词并运行代理
+        start = time.perf_counter()
+        plan = self.direct_plan(user_info) if self.mode == "direct" else None
+        if plan is not None and self.run_direct(user_info, plan):
+            self.used_mode = "direct"
+        else:
+            self.mediagent.run(HCR_PROMPT.format(user_info))
+            self.used_mode = "agent"
+        agent_time = time.perf_counter() - start
         # 添加系统提示到记忆
         self.mediagent.memory.add_memory(Message(Role.SYSTEM, OUTPUT_PROMPT))
         # 调用模型生成响应
+        start = time.perf_counter()
         response = call_model(self.mediagent.memory.memory, self.mediagent.api_key)
+        output_time = time.perf_counter() - start
         # 将模型响应添加到记忆
         self.mediagent.memory.add_memory(Message(Role.ASSISTANT, response))
         # 打印记忆内容
@@ -76,7 +145,16 @@ class Recommendation:
         print("=============================RESPONSE=============================")
         print(response)
         # 保存用户信息和推荐结果到数据库
+        start = time.perf_counter()
         self.save_history(user_info, response)
+        # 记录各阶段耗时(秒)，供压测统计
+        self.timings = {
+            "agent_llm": self.mediagent.timings["llm"],
+            "agent_tool": self.mediagent.timings["tool"],
+            "agent_other": agent_time - self.mediagent.timings["llm"] - self.mediagent.timings["tool"],
+            "output_llm": output_time,
+            "save_history": time.perf_counter() - start,
+        }
         return response
 
     def save_history(self, user_info, recommendation):
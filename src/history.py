@@ -0,0 +1,56 @@
+import sys
+import os
+
+# 获取当前文件所在目录和项目根目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# 导入所需模块
+import sqlite3
+import threading
+from config.settings import Config
+
+
+def frequent_queries(db_path: str = None, limit: int = 256):
+    """
+    从历史记录库中统计最常出现的检索语句，按出现次数降序返回：
+    search_by_id 的 "患者ID:xxxxxx" 和 search_by_other 的 "性别,年龄,身高,体重,既往病史,症状"
+    """
+    db_path = db_path or Config.HISTORY_DB_PATH
+    if not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(db_path)
+    try:
+        ids = conn.execute(
+            "SELECT id, COUNT(*) AS n FROM history GROUP BY id ORDER BY n DESC LIMIT ?", (limit,)
+        ).fetchall()
+        infos = conn.execute(
+            "SELECT gender, age, height, weight, medical_history, symptoms, COUNT(*) AS n FROM history "
+            "GROUP BY gender, age, height, weight, medical_history, symptoms ORDER BY n DESC LIMIT ?", (limit,)
+        ).fetchall()
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
+
+    counted = [(n, "患者ID:{}".format(user_id)) for user_id, n in ids]
+    counted += [(row[-1], ",".join(str(v) for v in row[:-1])) for row in infos]
+    counted.sort(key=lambda item: -item[0])
+    return [query for _, query in counted[:limit]]
+
+
+def warm_up_query_cache(embedding, db_path: str = None, limit: int = None):
+    """
+    在后台线程中把历史上最常见的检索语句预先向量化，写入嵌入模型的查询缓存
+    """
+    limit = limit if limit is not None else Config.QUERY_CACHE_WARMUP
+    if not limit:
+        return None
+    thread = threading.Thread(
+        target=lambda: embedding.warm_up(frequent_queries(db_path, limit)),
+        daemon=True,
+        name="query-cache-warm-up"
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,111 @@
+import sys
+import os
+
+# 获取当前文件所在目录和项目根目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+import csv
+import json
+import argparse
+import numpy as np
+from pathlib import Path
+from config.settings import Config
+from src.hospitals import parse_elements, EARTH_RADIUS_KM
+
+
+def load_hospitals(file_path: str, encoding: str = "utf-8"):
+    """
+    读取医院数据：
+    .csv 文件需包含 name, lat, lon 三列；
+    .json 文件为Overpass输出格式({"elements": [...]})，如从OSM导出的医院节点
+    """
+    if Path(file_path).suffix == ".csv":
+        with open(file_path, 'r', encoding=encoding) as f:
+            return [
+                {'name': row.get('name') or '未知医院', 'lat': float(row['lat']), 'lon': float(row['lon'])}
+                for row in csv.DictReader(f)
+            ]
+    with open(file_path, 'r', encoding=encoding) as f:
+        return parse_elements(json.load(f)['elements'])
+
+
+class HospitalIndex:
+    """
+    离线医院空间索引，基于haversine距离的BallTree，可持久化到磁盘。
+    """
+    def __init__(
+        self,
+        names: list,
+        coords: np.ndarray,
+        tree=None,
+    ):
+        self.names = names
+        self.coords = coords
+        if tree is None:
+            from sklearn.neighbors import BallTree
+            tree = BallTree(np.radians(coords), metric="haversine")
+        self.tree = tree
+
+    @classmethod
+    def build(
+        cls,
+        hospitals: list,
+    ):
+        """由 [{'name','lat','lon'}, ...] 构建索引"""
+        names = [h['name'] for h in hospitals]
+        coords = np.array([[h['lat'], h['lon']] for h in hospitals], dtype=np.float64)
+        return cls(names, coords)
+
+    def save(self, file_path: str):
+        """持久化名称、坐标和已构建的BallTree"""
+        import joblib
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        joblib.dump({"names": self.names, "coords": self.coords, "tree": self.tree}, file_path)
+
+    @classmethod
+    def load(cls, file_path: str):
+        import joblib
+        state = joblib.load(file_path)
+        return cls(state["names"], state["coords"], state["tree"])
+
+    def __len__(self):
+        return len(self.names)
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int = 25,
+        radius_km: float = 20,
+    ):
+        """返回radius_km内最近的k家医院，按距离(千米)升序排列"""
+        k = min(k, len(self))
+        if k == 0:
+            return []
+        dist, ind = self.tree.query(np.radians([[lat, lon]]), k=k)
+        hospitals = []
+        for d, i in zip(dist[0] * EARTH_RADIUS_KM, ind[0]):
+            if d > radius_km:
+                break
+            hospitals.append({
+                'name': self.names[i],
+                'lat': float(self.coords[i][0]),
+                'lon': float(self.coords[i][1]),
+                'distance': float(d),
+            })
+        return hospitals
+
+
+if __name__ == "__main__":
+    # 构建离线索引：python src/hospital_index.py hospitals.csv
+    parser = argparse.ArgumentParser(description="Build the offline hospital spatial index")
+    parser.add_argument("source", help="CSV (name,lat,lon) or Overpass-format JSON file")
+    parser.add_argument("--out", default=project_root + Config.HOSPITAL_INDEX_PATH)
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args()
+
+    index = HospitalIndex.build(load_hospitals(args.source, args.encoding))
+    index.save(args.out)
+    print(f"Indexed {len(index)} hospitals -> {args.out}")
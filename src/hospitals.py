@@ -0,0 +1,213 @@
+import sys
+import os
+
+# 获取当前文件所在目录和项目根目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+import json
+import math
+import time
+import threading
+from collections import OrderedDict
+from config.settings import Config
+from src.cache import DiskCache
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+
+
+def geohash_encode(lat: float, lon: float, precision: int = 5):
+    """将经纬度编码为geohash字符串"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits, bit_count, even = 0, 0, True
+    while len(geohash) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits = bits << 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(geohash)
+
+
+def geohash_decode(geohash: str):
+    """将geohash解码为格子中心点及半宽，返回(lat, lon, lat_err, lon_err)"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (
+        (lat_range[0] + lat_range[1]) / 2,
+        (lon_range[0] + lon_range[1]) / 2,
+        (lat_range[1] - lat_range[0]) / 2,
+        (lon_range[1] - lon_range[0]) / 2,
+    )
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """两点间球面距离（千米）"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def parse_elements(elements):
+    """将Overpass返回的elements转换为医院列表"""
+    hospitals = []
+    for element in elements:
+        if 'lat' not in element or 'lon' not in element:
+            continue
+        hospitals.append({
+            'name': element.get('tags', {}).get('name', '未知医院'),
+            'lat': element['lat'],
+            'lon': element['lon'],
+        })
+    return hospitals
+
+
+class OverpassBackend:
+    """
+    Overpass API后端，url既可以是overpass-api.de，也可以是本地替身服务(src/overpass_stub.py)
+    """
+    def __init__(self, url: str = Config.OVERPASS_URL, timeout: float = 10):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self, lat: float, lon: float, radius: int):
+        import requests
+        query = f"""
+        [out:json];
+        node["amenity"="hospital"](around:{radius},{lat},{lon});
+        out body;
+        """
+        response = requests.post(self.url, data=query, timeout=self.timeout)
+        response.raise_for_status()
+        return parse_elements(response.json()['elements'])
+
+
+class FixtureBackend:
+    """
+    本地fixture后端，读取Overpass格式({"elements": [...]})的JSON文件，用于测试和离线部署
+    """
+    def __init__(self, file_path: str):
+        with open(file_path, 'r', encoding="utf-8") as f:
+            self.hospitals = parse_elements(json.load(f)['elements'])
+
+    def fetch(self, lat: float, lon: float, radius: int):
+        return [
+            h for h in self.hospitals
+            if haversine(lat, lon, h['lat'], h['lon']) * 1000 <= radius
+        ]
+
+
+def make_backend(source: str = Config.OVERPASS_URL):
+    """根据配置创建后端：http(s)地址使用OverpassBackend，本地文件使用FixtureBackend"""
+    if source.startswith("http://") or source.startswith("https://"):
+        return OverpassBackend(source)
+    return FixtureBackend(source)
+
+
+class HospitalCache:
+    """
+    按geohash格子缓存医院POI。
+
+    每个格子只以max_radius(再加上格子半对角线)向后端查询一次，结果带TTL写入磁盘；
+    不同的用户位置和搜索半径都在本地按距离过滤，拖动滑块不会再触发网络请求。
+    """
+    def __init__(
+        self,
+        backend=None,
+        cache_dir: str = project_root + Config.HOSPITAL_CACHE_PATH,
+        ttl: float = Config.HOSPITAL_CACHE_TTL,
+        precision: int = 5,
+        max_radius: int = Config.HOSPITAL_MAX_RADIUS,
+        max_tiles: int = 1024,
+    ):
+        self.backend = backend if backend is not None else make_backend()
+        self.disk = DiskCache(cache_dir, ttl)
+        self.ttl = ttl
+        self.precision = precision
+        self.max_radius = max_radius
+        # 内存中最多保留max_tiles个格子(LRU)，更早的格子仍可从磁盘缓存读取
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._tile_locks = {}
+        # 全局锁只保护两个字典，网络请求在各格子自己的锁内进行，不同格子可以并行获取
+        self._lock = threading.Lock()
+
+    def _fetch_tile(self, tile: str):
+        center_lat, center_lon, lat_err, lon_err = geohash_decode(tile)
+        # 格子中心到任意角点的距离，保证格子内任意位置的max_radius圆都被覆盖
+        half_diagonal = haversine(center_lat, center_lon, center_lat + lat_err, center_lon + lon_err)
+        radius = int(self.max_radius + half_diagonal * 1000) + 1
+        return self.backend.fetch(center_lat, center_lon, radius)
+
+    def _cached_tile(self, tile: str):
+        with self._lock:
+            cached = self._tiles.get(tile)
+            if cached and time.time() - cached[0] <= self.ttl:
+                self._tiles.move_to_end(tile)
+                return cached[1]
+            return None
+
+    def get_tile(self, tile: str):
+        """获取一个格子内的全部医院(内存 -> 磁盘 -> 后端)"""
+        hospitals = self._cached_tile(tile)
+        if hospitals is not None:
+            return hospitals
+        with self._lock:
+            tile_lock = self._tile_locks.setdefault(tile, threading.Lock())
+        # 同一格子的并发请求只有一个访问后端，其余等待后直接读取结果
+        with tile_lock:
+            hospitals = self._cached_tile(tile)
+            if hospitals is not None:
+                return hospitals
+            key = f"{tile}:{self.max_radius}"
+            entry = self.disk.get_entry(key)
+            if entry is None:
+                hospitals = self._fetch_tile(tile)
+                self.disk.set(key, hospitals)
+                fetched_at = time.time()
+            else:
+                # 沿用磁盘条目的写入时间，内存中的条目与磁盘条目同时过期
+                fetched_at, hospitals = entry
+            with self._lock:
+                self._tiles[tile] = (fetched_at, hospitals)
+                self._tiles.move_to_end(tile)
+                while len(self._tiles) > self.max_tiles:
+                    evicted, _ = self._tiles.popitem(last=False)
+                    self._tile_locks.pop(evicted, None)
+            return hospitals
+
+    def get_hospitals(self, lat: float, lon: float, radius: int = 20000):
+        """返回radius(米)内的医院，按距离(千米)升序排列"""
+        if radius > self.max_radius:
+            raise ValueError(f"radius must not exceed {self.max_radius} meters")
+        tile = geohash_encode(lat, lon, self.precision)
+        hospitals = []
+        for h in self.get_tile(tile):
+            distance = haversine(lat, lon, h['lat'], h['lon'])
+            if distance * 1000 <= radius:
+                hospitals.append({**h, 'distance': distance})
+        hospitals.sort(key=lambda h: h['distance'])
+        return hospitals
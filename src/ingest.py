@@ -0,0 +1,207 @@
+import sys
+import os
+
+# 获取当前文件所在目录和项目根目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# 导入所需模块
+import time
+import queue
+import argparse
+import threading
+from pathlib import Path
+from agentos.rag.load import DataLoader, csv_rows_iter
+from agentos.rag.split import SentenceSplit
+from agentos.rag.embedding import EmbeddingModel
+from agentos.rag.store import ChromaDB
+from src.vectorstore import CSV_COLUMN_TYPES
+
+_DONE = object()
+
+
+class IngestPipeline:
+    """
+    流水线入库：加载 -> 拆分 -> 向量化 -> 写入 四个阶段各占一个线程并行执行，
+    阶段之间用有界队列连接(队列满时上游阻塞，即背压)，
+    向量化阶段使用 sentence-transformers 的多进程池占满所有CPU核。
+    """
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel,
+        store: ChromaDB,
+        splitter=None,
+        batch_size: int = 256,
+        queue_size: int = 4,
+        processes: int = os.cpu_count() or 1,
+        csv_column_types: dict = None,
+    ):
+        self.embedding_model = embedding_model
+        self.store = store
+        self.splitter = splitter if splitter is not None else SentenceSplit(
+            chunk_token_size=256,
+            tokenizer=embedding_model.embedding_model.tokenizer
+        )
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.processes = processes
+        self.csv_column_types = csv_column_types
+        self.stop = threading.Event()
+        self.errors = []
+        self.counts = {"documents": 0, "chunks": 0, "embedded": 0, "written": 0}
+        self.counts_lock = threading.Lock()
+
+    def count(self, key, n):
+        with self.counts_lock:
+            self.counts[key] += n
+
+    def put(self, q, item):
+        # 带超时地放入队列，下游出错时不会永远阻塞
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, q):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def stage(self, fn, in_q, out_q):
+        def run():
+            try:
+                fn(in_q, out_q)
+            except Exception as e:
+                self.errors.append(e)
+                self.stop.set()
+            finally:
+                if out_q is not None:
+                    self.put(out_q, _DONE)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def load_stage(self, sources, out_q):
+        for source in sources:
+            self.count("documents", 1)
+            if Path(source).suffix == ".csv":
+                # CSV按行流式读取为带元数据的记录(无需再拆分)，每batch_size行送入下游一次，
+                # 大文件的读取与向量化重叠进行，内存中最多只有queue_size批记录
+                batch = []
+                for row in csv_rows_iter(source, encoding="utf-8", column_types=self.csv_column_types):
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        self.put(out_q, batch)
+                        batch = []
+                    if self.stop.is_set():
+                        return
+                if batch:
+                    self.put(out_q, batch)
+            else:
+                self.put(out_q, DataLoader(source).load_data())
+
+    def split_stage(self, in_q, out_q):
+        batch = []
+        while (data := self.get(in_q)) is not _DONE:
+            chunks = data if isinstance(data, list) else self.splitter.split(data)
+            self.count("chunks", len(chunks))
+            for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) >= self.batch_size:
+                    self.put(out_q, batch)
+                    batch = []
+        if batch:
+            self.put(out_q, batch)
+
+    def embed_stage(self, in_q, out_q):
+        model = self.embedding_model.embedding_model
+        pool = None
+        # 多进程池仅 sentence-transformers 后端支持
+        if self.processes > 1 and hasattr(model, "start_multi_process_pool"):
+            pool = model.start_multi_process_pool(target_devices=["cpu"] * self.processes)
+        try:
+            while (batch := self.get(in_q)) is not _DONE:
+                texts = [c.get_content() for c in batch]
+                if pool is not None:
+                    embeddings = model.encode_multi_process(texts, pool)
+                else:
+                    embeddings = model.encode(texts)
+                self.count("embedded", len(batch))
+                self.put(out_q, (batch, embeddings))
+        finally:
+            if pool is not None:
+                model.stop_multi_process_pool(pool)
+
+    def write_stage(self, in_q, out_q):
+        while (item := self.get(in_q)) is not _DONE:
+            batch, embeddings = item
+            self.store.add_data(batch, embeddings=[e.tolist() for e in embeddings])
+            self.count("written", len(batch))
+
+    def run(self, sources, report_interval: float = 5.0):
+        """执行入库，定期打印各阶段进度和吞吐量，返回各阶段计数"""
+        loaded_q = queue.Queue(maxsize=self.queue_size)
+        split_q = queue.Queue(maxsize=self.queue_size)
+        embedded_q = queue.Queue(maxsize=self.queue_size)
+
+        start = time.perf_counter()
+        threads = [
+            self.stage(lambda _, out_q: self.load_stage(sources, out_q), None, loaded_q),
+            self.stage(self.split_stage, loaded_q, split_q),
+            self.stage(self.embed_stage, split_q, embedded_q),
+            self.stage(self.write_stage, embedded_q, None),
+        ]
+        while threads[-1].is_alive():
+            threads[-1].join(timeout=report_interval)
+            self.report(time.perf_counter() - start)
+        for thread in threads:
+            thread.join()
+
+        if self.errors:
+            raise self.errors[0]
+        return dict(self.counts)
+
+    def report(self, elapsed):
+        with self.counts_lock:
+            counts = dict(self.counts)
+        print(
+            f"[{elapsed:7.1f}s] documents {counts['documents']}  chunks {counts['chunks']}  "
+            f"embedded {counts['embedded']}  written {counts['written']}  "
+            f"({counts['written'] / elapsed if elapsed > 0 else 0:.1f} chunks/s)"
+        )
+
+
+if __name__ == "__main__":
+    # 示例：python src/ingest.py --store vectordb/vector_db_3 data/history_2024.csv data/guide.pdf --processes 8
+    parser = argparse.ArgumentParser(description="Pipelined multi-process ingestion into a Chroma store")
+    parser.add_argument("sources", nargs="+", help="files to ingest (.csv/.pdf/.txt/.json)")
+    parser.add_argument("--store", required=True, help="directory of a new persistent store")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--chunk-tokens", type=int, default=256)
+    args = parser.parse_args()
+
+    # 初始化嵌入模型
+    embedding = EmbeddingModel(model_name="BAAI/bge-base-zh-v1.5")
+    store = ChromaDB.create_document(embedding_model=embedding, if_persist=True, dir=args.store)
+    pipeline = IngestPipeline(
+        embedding,
+        store,
+        splitter=SentenceSplit(chunk_token_size=args.chunk_tokens, tokenizer=embedding.embedding_model.tokenizer),
+        batch_size=args.batch_size,
+        queue_size=args.queue_size,
+        processes=args.processes,
+        csv_column_types=CSV_COLUMN_TYPES,
+    )
+    start = time.perf_counter()
+    counts = pipeline.run(args.sources)
+    elapsed = time.perf_counter() - start
+    print(f"done: {counts['written']} chunks from {counts['documents']} documents in {elapsed:.1f}s "
+          f"({counts['written'] / elapsed if elapsed > 0 else 0:.1f} chunks/s)")
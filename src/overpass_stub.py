@@ -0,0 +1,58 @@
+import sys
+import os
+
+# 获取当前文件所在目录和项目根目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+import re
+import json
+import argparse
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.hospitals import FixtureBackend
+
+AROUND_PATTERN = re.compile(r"around:\s*([\d.]+)\s*,\s*(-?[\d.]+)\s*,\s*(-?[\d.]+)")
+
+
+def make_handler(backend: FixtureBackend):
+    class OverpassStubHandler(BaseHTTPRequestHandler):
+        """只支持 node["amenity"="hospital"](around:r,lat,lon) 形式的查询"""
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            query = self.rfile.read(length).decode("utf-8")
+            # 兼容 data=<query> 的表单提交方式
+            if query.startswith("data="):
+                query = parse_qs(query)["data"][0]
+            match = AROUND_PATTERN.search(query)
+            if not match:
+                self.send_error(400, "only around: queries are supported")
+                return
+            radius, lat, lon = (float(v) for v in match.groups())
+            elements = [
+                {"type": "node", "lat": h['lat'], "lon": h['lon'], "tags": {"amenity": "hospital", "name": h['name']}}
+                for h in backend.fetch(lat, lon, radius)
+            ]
+            body = json.dumps({"elements": elements}, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return OverpassStubHandler
+
+
+if __name__ == "__main__":
+    # 本地Overpass替身服务：python src/overpass_stub.py hospitals.json --port 8765
+    # 然后设置 HCR_OVERPASS_URL=http://127.0.0.1:8765/api/interpreter
+    parser = argparse.ArgumentParser(description="Local Overpass stand-in serving hospitals from an Overpass-format JSON file")
+    parser.add_argument("fixture", help="JSON file in Overpass output format ({\"elements\": [...]})")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(FixtureBackend(args.fixture)))
+    print(f"Overpass stand-in listening on http://{args.host}:{args.port}/api/interpreter")
+    server.serve_forever()
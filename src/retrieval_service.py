@@ -0,0 +1,61 @@
+import sys
+import os
+
+# 获取当前文件所在目录和项目根目录
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# 导入所需模块
+import argparse
+from agentos.rag.embedding import EmbeddingModel
+from agentos.rag.batching import BatchingEmbeddingModel
+from agentos.rag.rerank import Rerank
+from agentos.rag.store import ChromaDB
+from agentos.rag.concurrency import ConcurrentStore
+from agentos.rag.service import RetrievalServer
+from agentos.utils import metrics
+from src.history import warm_up_query_cache
+from config.settings import Config
+
+
+def build_server(with_rerank: bool = True):
+    """
+    加载一份嵌入模型、重排序模型和两个向量数据库，供所有页面和批处理进程共享
+    """
+    embedding = BatchingEmbeddingModel(
+        EmbeddingModel(
+            model_name="BAAI/bge-base-zh-v1.5",
+            backend=Config.EMBEDDING_BACKEND,
+            query_cache_size=Config.QUERY_CACHE_SIZE
+        ),
+        max_batch_size=Config.EMBEDDING_BATCH_SIZE,
+        max_wait_ms=Config.EMBEDDING_BATCH_WAIT_MS
+    )
+    warm_up_query_cache(embedding)
+    reranker = Rerank(model_name="cross-encoder/ms-marco-MiniLM-L6-v2", backend=Config.EMBEDDING_BACKEND) if with_rerank else None
+    stores = {
+        "v1": ConcurrentStore(ChromaDB.load_document(embedding_model=embedding, dir=project_root + Config.VECTORSTORE1_PATH),
+                              max_workers=Config.STORE_QUERY_WORKERS),
+        "v2": ConcurrentStore(ChromaDB.load_document(embedding_model=embedding, dir=project_root + Config.VECTORSTORE2_PATH),
+                              max_workers=Config.STORE_QUERY_WORKERS),
+    }
+    return RetrievalServer(embedding, stores, reranker)
+
+
+if __name__ == "__main__":
+    # 启动服务后设置 HCR_RETRIEVAL_SERVICE=<address>，src/tools.py 会改用远程客户端
+    parser = argparse.ArgumentParser(description="Shared embedding/retrieval service")
+    parser.add_argument("--address", default=Config.RETRIEVAL_SERVICE or "127.0.0.1:8600",
+                        help='"host:port" or "unix:/path/to.sock"')
+    parser.add_argument("--no-rerank", action="store_true", help="do not load the cross-encoder")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on this port")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        metrics.enable()
+        metrics.serve_metrics(args.metrics_port)
+
+    server = build_server(with_rerank=not args.no_rerank)
+    print(f"Retrieval service listening on {args.address}")
+    server.serve(args.address)
@@ -7,27 +7,72 @@ project_root = os.path.dirname(current_dir)
 sys.path.insert(0, project_root)
 
 # 导入所需模块
-from agentos.rag.embedding import EmbeddingModel
-from agentos.rag.store import ChromaDB
 from config.settings import Config
 from agentos.rag.data import merge_content
 
-# 初始化嵌入模型
-embedding = EmbeddingModel(
-    model_name="BAAI/bge-base-zh-v1.5",
-    # cache_dir="/mnt/7T/xz"
-)
-
-# 加载两个向量数据库
-v1 = ChromaDB.load_document(
-    embedding_model=embedding,
-    dir=project_root + Config.VECTORSTORE1_PATH
-)
-
-v2 = ChromaDB.load_document(
-    embedding_model=embedding,
-    dir=project_root + Config.VECTORSTORE2_PATH
-)
+if Config.RETRIEVAL_SERVICE:
+    # 使用共享检索服务(python src/retrieval_service.py)，本进程不加载模型
+    from agentos.rag.service import RemoteChromaDB
+    v1 = RemoteChromaDB(Config.RETRIEVAL_SERVICE, "v1")
+    v2 = RemoteChromaDB(Config.RETRIEVAL_SERVICE, "v2")
+else:
+    from agentos.rag.embedding import EmbeddingModel
+    from agentos.rag.batching import BatchingEmbeddingModel
+    from agentos.rag.store import ChromaDB
+    from agentos.rag.concurrency import ConcurrentStore
+    from src.history import warm_up_query_cache
+
+    # 初始化嵌入模型，并发会话的查询向量合并成一次前向计算
+    embedding = BatchingEmbeddingModel(
+        EmbeddingModel(
+            model_name="BAAI/bge-base-zh-v1.5",
+            # cache_dir="/mnt/7T/xz"
+            backend=Config.EMBEDDING_BACKEND,
+            query_cache_size=Config.QUERY_CACHE_SIZE
+        ),
+        max_batch_size=Config.EMBEDDING_BATCH_SIZE,
+        max_wait_ms=Config.EMBEDDING_BATCH_WAIT_MS
+    )
+
+    # 后台用历史记录中最常见的查询预热查询向量缓存
+    warm_up_query_cache(embedding)
+
+    # 加载两个向量数据库；所有Streamlit会话线程共享，查询并发执行，写入时加写锁
+    v1 = ConcurrentStore(ChromaDB.load_document(
+        embedding_model=embedding,
+        dir=project_root + Config.VECTORSTORE1_PATH
+    ), max_workers=Config.STORE_QUERY_WORKERS)
+
+    v2 = ConcurrentStore(ChromaDB.load_document(
+        embedding_model=embedding,
+        dir=project_root + Config.VECTORSTORE2_PATH
+    ), max_workers=Config.STORE_QUERY_WORKERS)
+
+
+GENDER_MAP = {"male": "男", "female": "女", "男": "男", "女": "女"}
+AGE_BAND = 10
+
+
+def build_patient_filter(user_info: str):
+    """
+    根据"性别,年龄(岁),..."格式的用户信息构造元数据过滤条件：同性别且年龄相差不超过AGE_BAND岁
+    """
+    fields = [f.strip() for f in user_info.replace("，", ",").split(",")]
+    conditions = []
+    if fields and fields[0] in GENDER_MAP:
+        conditions.append({"性别": GENDER_MAP[fields[0]]})
+    if len(fields) > 1:
+        try:
+            age = int(float(fields[1].rstrip("岁")))
+            conditions.append({"年龄(岁)": {"$gte": age - AGE_BAND}})
+            conditions.append({"年龄(岁)": {"$lte": age + AGE_BAND}})
+        except ValueError:
+            pass
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
 
 
 class search_by_id:
@@ -69,7 +114,18 @@ class search_by_other:
         Returns:
             str: 查询结果
         """
-        result = v1.query_data(user_info, query_num=int(num))
+        num = int(num)
+        where = build_patient_filter(user_info)
+        result = v1.query_data(user_info, query_num=num, where=where) if where else []
+        # 按行入库的向量库才有性别/年龄元数据，过滤结果不足时用全量检索补足，跳过重复的记录
+        if len(result) < num:
+            seen = {d.get_content() for d in result}
+            for d in v1.query_data(user_info, query_num=num + len(result)):
+                if len(result) >= num:
+                    break
+                if d.get_content() not in seen:
+                    seen.add(d.get_content())
+                    result.append(d)
         result = merge_content(result)
         return result
 
@@ -10,39 +10,73 @@ sys.path.insert(0, project_root)
 from agentos.rag.data import merge_content
 from agentos.rag.load import DataLoader, csv_load, pdf_load
 from config.settings import Config
-from agentos.rag.split import CharacterSplit, RowSplit
+from agentos.rag.split import CharacterSplit, RowSplit, SentenceSplit
 from agentos.rag.embedding import EmbeddingModel
 from agentos.rag.store import ChromaDB
 from chromadb.api import ClientAPI
 from chromadb.api.models.Collection import Collection
 
 
+PDF_CHUNK_TOKENS = 256
+CSV_COLUMN_TYPES = {"年龄(岁)": int, "身高(cm)": int, "体重(kg)": int}
+
+
+def split_report(data, chunks):
+    """
+    打印拆分前后的块数对比（按行拆分 vs 当前拆分）
+    """
+    row_chunks = RowSplit(chunk_row_size=1, chunk_overlap=0).split(data)
+    avg_len = sum(len(c.get_content()) for c in chunks) / max(len(chunks), 1)
+    print(f"chunks: {len(row_chunks)} (RowSplit) -> {len(chunks)}, average {avg_len:.0f} characters per chunk")
+
+
+def add_reduced(store, data, dim=None):
+    """
+    写入数据；配置了降维时先在全部数据的向量上拟合PCA(投影随库一起保存)，再写入降维后的向量
+    """
+    dim = dim if dim is not None else Config.VECTOR_DIM
+    if not dim:
+        store.add_data(data)
+        return
+    embeddings = store.embedding_model.encode(data)
+    store.fit_projection(embeddings, dim)
+    store.add_data(data, embeddings=embeddings)
+
+
 def process_data():
     """
     处理数据的主函数，包括加载数据、拆分数据、嵌入模型和存储数据。
     """
 
-    # 加载 CSV 和 PDF 数据
-    csv = DataLoader(project_root + Config.DATA["csv"], encoding="utf-8").load_data()
+    # 加载 CSV 和 PDF 数据（CSV每行一条记录，各列作为带类型的元数据，便于按性别/年龄过滤）
+    csv_rows = DataLoader(
+        project_root + Config.DATA["csv"],
+        encoding="utf-8",
+        row_mode=True,
+        column_types=CSV_COLUMN_TYPES
+    ).load_data()
     pdf = DataLoader(project_root + Config.DATA["pdf"], encoding="utf-8").load_data()
 
-    # 拆分数据为小块
-    csv_split = RowSplit(chunk_row_size=1, chunk_overlap=0).split(csv)
-    pdf_split = RowSplit(chunk_row_size=1, chunk_overlap=0).split(pdf)
-
     # 初始化嵌入模型
     embedding = EmbeddingModel(
         model_name="BAAI/bge-base-zh-v1.5",
         cache_dir="/mnt/7T/xz"
     )
 
+    # 拆分数据为小块：PDF按句子打包到目标token数，避免每个视觉行单独成块
+    pdf_split = SentenceSplit(
+        chunk_token_size=PDF_CHUNK_TOKENS,
+        tokenizer=embedding.embedding_model.tokenizer
+    ).split(pdf)
+    split_report(pdf, pdf_split)
+
     # 创建并存储 CSV 数据的向量数据库
     vector_db1 = ChromaDB.create_document(
         embedding_model=embedding,
         if_persist=True,
         dir=project_root + Config.VECTORSTORE1_PATH
     )
-    vector_db1.add_data(csv_split)
+    add_reduced(vector_db1, csv_rows)
 
     # 创建并存储 PDF 数据的向量数据库
     vector_db2 = ChromaDB.create_document(
@@ -50,7 +84,7 @@ def process_data():
         if_persist=True,
         dir=project_root + Config.VECTORSTORE2_PATH
     )
-    vector_db2.add_data(pdf_split)
+    add_reduced(vector_db2, pdf_split)
 
     # 返回两个向量数据库对象
     return vector_db1, vector_db2
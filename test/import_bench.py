@@ -0,0 +1,85 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# Import-time budget for agentos.
+#
+#   python test/import_bench.py                   # default 300 ms budget per module
+#   python test/import_bench.py --budget-ms 150 --repeat 7
+#
+# Every module is imported in a fresh interpreter under `python -X importtime`; the
+# median cumulative import time must stay within the budget, and none of the heavy
+# dependencies below may be loaded as a side effect (they are imported on first use).
+# Exits 1 when a module is over budget or pulls in a heavy dependency.
+
+import json
+import argparse
+import statistics
+import subprocess
+
+MODULES = [
+    "agentos",
+    "agentos.agent",
+    "agentos.memory",
+    "agentos.utils",
+    "agentos.rag",
+    "agentos.rag.load",
+    "agentos.rag.split",
+    "agentos.rag.embedding",
+    "agentos.rag.rerank",
+    "agentos.rag.store",
+    "agentos.rag.cache",
+    "agentos.rag.service",
+]
+
+HEAVY = ["torch", "sentence_transformers", "transformers", "chromadb", "pypdf", "numpy", "onnxruntime", "together", "openai"]
+
+
+def import_time_us(module:str):
+    """Cumulative import time of `module` in microseconds, from a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=project_root)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=project_root,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    for line in reversed(result.stderr.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def heavy_imports(module:str):
+    env = dict(os.environ, PYTHONPATH=project_root)
+    code = f"import sys, json, {module}; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=project_root)
+    return json.loads(result.stdout) if result.returncode == 0 else []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="agentos import-time budget")
+    parser.add_argument("--budget-ms", type=float, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--modules", default=",".join(MODULES))
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<24}{'median ms':>10}  heavy dependencies")
+    for module in args.modules.split(","):
+        try:
+            median = statistics.median(import_time_us(module) for _ in range(args.repeat)) / 1000
+        except RuntimeError as e:
+            print(f"{module:<24}{'error':>10}  {e}")
+            failed = True
+            continue
+        heavy = heavy_imports(module)
+        over = median > args.budget_ms
+        failed = failed or over or bool(heavy)
+        print(f"{module:<24}{median:>10.1f}  {', '.join(heavy) or '-'}{'  OVER BUDGET' if over else ''}")
+
+    print(f"budget {args.budget_ms:.0f} ms: {'FAIL' if failed else 'OK'}")
+    sys.exit(1 if failed else 0)
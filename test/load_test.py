@@ -0,0 +1,121 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# End-to-end load test for Recommendation.run against the mock LLM server.
+#
+#   python test/load_test.py --concurrency 8 --requests 64
+#   python test/load_test.py --base-url http://127.0.0.1:8700/v1 --no-mock   # an already running server
+#   python test/load_test.py --mode agent     # always use the ReAct loop (default: direct pipeline)
+#   python test/load_test.py --priority interactive   # measure at interactive priority (default: batch)
+#
+# Reports throughput, p50/p99 latency and the mean per-stage breakdown
+# (agent LLM calls, tool calls, final output call, history write).
+
+import time
+import random
+import argparse
+import threading
+import statistics
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from agentos.utils import llm_priority
+
+
+def percentile(values, p):
+    values = sorted(values)
+    index = min(int(round(p / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def make_user_info(i: int):
+    rng = random.Random(i)
+    return {
+        "id": str(100000 + i),
+        "gender": rng.choice(["male", "female"]),
+        "age": rng.randint(18, 85),
+        "height": rng.randint(150, 190),
+        "weight": rng.randint(45, 100),
+        "medical_history": rng.choice(["高血压", "高血脂", "糖尿病", "无"]),
+        "symptoms": rng.choice(["头晕", "胸闷", "乏力", "咳嗽"]),
+    }
+
+
+def run_load(concurrency: int, total: int, mode: str = "direct", priority: str = "batch"):
+    from src.hcr import Recommendation
+
+    local = threading.local()
+    results = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(i):
+        # sqlite connections are per thread, so each worker keeps its own Recommendation
+        if not hasattr(local, "recommendation"):
+            local.recommendation = Recommendation(api_key="mock", mode=mode)
+        recommendation = local.recommendation
+        recommendation.mediagent.memory.memory = recommendation.mediagent.memory.memory[:1]
+        recommendation.mediagent.timings = {"llm": 0.0, "tool": 0.0}
+        start = time.perf_counter()
+        try:
+            # llm_priority is per thread, so each worker sets it around its own calls
+            with llm_priority(priority):
+                recommendation.run(make_user_info(i))
+        except Exception as e:
+            with lock:
+                errors.append(e)
+            return
+        latency = time.perf_counter() - start
+        with lock:
+            results.append((latency, dict(recommendation.timings)))
+
+    start = time.perf_counter()
+    # Recommendation.run prints the whole memory; keep the report readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    return results, errors, elapsed
+
+
+def report(results, errors, elapsed, concurrency):
+    latencies = [r[0] for r in results]
+    print(f"concurrency       {concurrency}")
+    print(f"completed         {len(results)}  errors {len(errors)}")
+    if errors:
+        print(f"first error       {errors[0]!r}")
+    if not results:
+        return
+    print(f"throughput        {len(results) / elapsed:.2f} req/s")
+    print(f"latency p50       {percentile(latencies, 50):.3f} s")
+    print(f"latency p99       {percentile(latencies, 99):.3f} s")
+    print("stage breakdown (mean seconds per request)")
+    for stage in results[0][1]:
+        print(f"  {stage:<16}{statistics.mean(r[1][stage] for r in results):.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test Recommendation.run")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8700/v1")
+    parser.add_argument("--no-mock", action="store_true", help="do not start the in-process mock server")
+    parser.add_argument("--latency", type=float, default=0.3, help="mock server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--mode", choices=["direct", "agent"], default="direct")
+    parser.add_argument("--priority", choices=["batch", "interactive"], default="batch",
+                        help="rate-limiter priority of the generated load")
+    args = parser.parse_args()
+
+    os.environ["AGENTOS_LLM_BASE_URL"] = args.base_url
+    if not args.no_mock:
+        from urllib.parse import urlparse
+        from mock_llm_server import serve
+        url = urlparse(args.base_url)
+        server = serve(url.hostname, url.port, args.latency, args.jitter)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results, errors, elapsed = run_load(args.concurrency, args.requests, args.mode, args.priority)
+    report(results, errors, elapsed, args.concurrency)
@@ -0,0 +1,141 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# Offline OpenAI-compatible chat-completions stand-in for load testing.
+#
+#   python test/mock_llm_server.py --port 8700 --latency 0.5 --jitter 0.2
+#   AGENTOS_LLM_BASE_URL=http://127.0.0.1:8700/v1 python src/hcr.py
+#
+# Replies follow the HCR ReAct script (search_by_id -> search_by_other ->
+# recommend_by_age -> recommend_by_gender -> finish) in the
+# thought:/function:/argument: format, then a canned recommendation once
+# OUTPUT_PROMPT has been appended. "stream": true requests are answered with SSE chunks.
+
+import re
+import json
+import time
+import uuid
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def parse_user_info(messages):
+    """Pull id/age/gender/history/symptoms out of the HCR_PROMPT user message."""
+    text = "\n".join(m["content"] for m in messages if m["role"] == "user")
+
+    def find(key, default):
+        match = re.search(rf"'{key}':\s*'?([^',}}]*)'?", text)
+        return match.group(1).strip() if match else default
+
+    return {
+        "id": find("id", "000000"),
+        "gender": find("gender", "male"),
+        "age": find("age", "40"),
+        "height": find("height", "170"),
+        "weight": find("weight", "65"),
+        "medical_history": find("medical_history", "无"),
+        "symptoms": find("symptoms", "无"),
+    }
+
+
+def scripted_reply(messages):
+    last = messages[-1]
+    if last["role"] == "system" and "推荐项目" in last["content"]:
+        return (
+            "1. 推荐项目：🩸血常规、❤️心电图、🩺血压监测、🧪血脂检查\n"
+            "2. 推荐理由：结合年龄、既往病史和症状综合考虑\n"
+            "3. 注意事项：检查前空腹8小时，保持充足睡眠"
+        )
+
+    info = parse_user_info(messages)
+    step = sum(1 for m in messages if m["role"] == "assistant")
+    plan = [
+        ("先根据ID查询历史体检信息", "search_by_id", [info["id"]]),
+        ("查询相似患者的体检信息", "search_by_other", ["3", f"{info['gender']},{info['age']},{info['height']},{info['weight']},{info['medical_history']},{info['symptoms']}"]),
+        ("根据年龄推荐体检项目", "recommend_by_age", [info["age"]]),
+        ("根据性别推荐体检项目", "recommend_by_gender", [info["gender"]]),
+    ]
+    if step >= len(plan):
+        return "thought:已经收集到足够的信息\nfunction:finish"
+    thought, function, args = plan[step]
+    lines = [f"thought:{thought}", f"function:{function}"]
+    lines += [f"argument{i + 1}:{arg}" for i, arg in enumerate(args)]
+    return "\n".join(lines)
+
+
+def make_handler(latency: float, jitter: float, token_latency: float):
+    class MockChatHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            content = scripted_reply(request["messages"])
+            model = request.get("model", "mock")
+            time.sleep(max(latency + random.uniform(-jitter, jitter), 0))
+
+            completion_id = f"mock-{uuid.uuid4().hex}"
+            usage = {"prompt_tokens": 0, "completion_tokens": len(content), "total_tokens": len(content)}
+            if request.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for i in range(0, len(content), 4):
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                        "choices": [{"index": 0, "delta": {"role": "assistant", "content": content[i:i + 4]}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(token_latency)
+                final = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage,
+                }
+                self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+                self.close_connection = True
+                return
+
+            body = json.dumps({
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockChatHandler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8700, latency: float = 0.0, jitter: float = 0.0, token_latency: float = 0.0):
+    server = ThreadingHTTPServer((host, port), make_handler(latency, jitter, token_latency))
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first byte")
+    parser.add_argument("--jitter", type=float, default=0.0, help="uniform +/- jitter on latency")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="seconds between streamed chunks")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency, args.jitter, args.token_latency)
+    print(f"Mock LLM listening on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
@@ -0,0 +1,76 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# Parity and latency check of the ONNX Runtime backend against PyTorch.
+#
+#   python test/onnx_parity_test.py
+#   python test/onnx_parity_test.py --no-quantize --min-cosine 0.999
+#
+# Fails when any embedding's cosine similarity to the PyTorch embedding is
+# below --min-cosine, or when the reranker's top-1 passage differs.
+
+import time
+import argparse
+import numpy as np
+from agentos.rag.embedding import EmbeddingModel
+from agentos.rag.rerank import Rerank
+
+TEXTS = [
+    "患者ID:384592,性别:男,年龄(岁):32,身高(cm):175,体重(kg):68,既往病史:无,体检前的症状:偶尔头痛",
+    "患者ID:671203,性别:女,年龄(岁):45,身高(cm):162,体重(kg):55,既往病史:高血压,体检前的症状:头晕",
+    "男,50,172,80,高血压,头晕",
+    "高血压患者应定期监测血压，并进行血脂、血糖和心电图检查。",
+    "头痛是常见症状，可能由高血压、颈椎病或睡眠不足引起。",
+    "体检前一天晚上八点后禁食，保持充足睡眠。",
+    "What should I check for chest tightness?",
+    "胸闷",
+]
+
+
+def latency(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ONNX backend parity test")
+    parser.add_argument("--embedding-model", default="BAAI/bge-base-zh-v1.5")
+    parser.add_argument("--rerank-model", default="cross-encoder/ms-marco-MiniLM-L6-v2")
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    quantize = not args.no_quantize
+
+    torch_embedding = EmbeddingModel(model_name=args.embedding_model)
+    onnx_embedding = EmbeddingModel(model_name=args.embedding_model, backend="onnx", quantize=quantize)
+
+    a = np.asarray(torch_embedding(TEXTS))
+    b = np.asarray(onnx_embedding(TEXTS))
+    cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    print(f"embedding cosine: min {cosine.min():.5f}  mean {cosine.mean():.5f}")
+
+    torch_rerank = Rerank(model_name=args.rerank_model)
+    onnx_rerank = Rerank(model_name=args.rerank_model, backend="onnx", quantize=quantize)
+    query = "高血压 头晕"
+    torch_top = torch_rerank.rerank(query, TEXTS)[0]["corpus_id"]
+    onnx_top = onnx_rerank.rerank(query, TEXTS)[0]["corpus_id"]
+    print(f"rerank top-1: torch {torch_top}  onnx {onnx_top}")
+
+    print("latency (ms)            torch      onnx")
+    for name, fa, fb in [
+        ("encode 1 query", lambda: torch_embedding(TEXTS[:1]), lambda: onnx_embedding(TEXTS[:1])),
+        (f"encode {len(TEXTS)} texts", lambda: torch_embedding(TEXTS), lambda: onnx_embedding(TEXTS)),
+        (f"rerank {len(TEXTS)} passages", lambda: torch_rerank.rerank(query, TEXTS), lambda: onnx_rerank.rerank(query, TEXTS)),
+    ]:
+        print(f"{name:<22}{latency(fa, args.repeat) * 1000:>8.2f}  {latency(fb, args.repeat) * 1000:>8.2f}")
+
+    assert cosine.min() >= args.min_cosine, f"embedding cosine {cosine.min():.5f} < {args.min_cosine}"
+    assert torch_top == onnx_top, "rerank top-1 differs between backends"
+    print("OK")
@@ -0,0 +1,95 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# Checks of the SQLite-backed agent memory (agentos.memory.persistent); stdlib only.
+#
+#   python test/persistent_memory_test.py
+#   python test/persistent_memory_test.py --processes 8 --messages 100
+#
+# Several processes append to one session of a shared database at once: every
+# message must be stored with a distinct, gap-free seq. Also covers the turn window,
+# clear, and that a session evicted from the LRU but still in use is not reloaded
+# as a second copy. Exits 1 when a check fails.
+
+import gc
+import argparse
+import tempfile
+import multiprocessing
+from agentos.memory import Message, Role
+from agentos.memory.persistent import MemoryStore
+
+failures = []
+
+
+def check(name, ok, detail=""):
+    print(f"{'ok  ' if ok else 'FAIL'} {name}{'' if ok else '  ' + str(detail)}")
+    if not ok:
+        failures.append(name)
+
+
+def append_many(path, worker, messages):
+    store = MemoryStore(path)
+    for i in range(messages):
+        store.append("shared", "user", f"{worker}-{i}")
+    store.close()
+
+
+def test_concurrent_processes(path, processes, messages):
+    MemoryStore(path).close()
+    workers = [multiprocessing.Process(target=append_many, args=(path, n, messages)) for n in range(processes)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    check("no appending process failed", all(w.exitcode == 0 for w in workers), [w.exitcode for w in workers])
+    store = MemoryStore(path)
+    seqs = [row[0] for row in store.conn.execute("SELECT seq FROM messages WHERE session_id='shared' ORDER BY seq")]
+    check("every message gets a distinct, gap-free seq", seqs == list(range(processes * messages)), len(seqs))
+    store.close()
+
+
+def test_window_and_clear(path):
+    store = MemoryStore(path, window=2)
+    memory = store.session("window")
+    memory.add_memory(Message(Role.SYSTEM, "system prompt"))
+    for turn in range(4):
+        memory.add_memory(Message(Role.USER, f"question {turn}"))
+        memory.add_memory(Message(Role.ASSISTANT, f"answer {turn}"))
+    expected = ["system prompt", "question 2", "answer 2", "question 3", "answer 3"]
+    check("memory keeps the system prompt and the last window turns", [m["content"] for m in memory.memory] == expected, memory.memory)
+    check("a reload sees the same window", [m["content"] for m in store.load("window")] == expected, store.load("window"))
+    check("history keeps every message", len(store.history("window")) == 9, len(store.history("window")))
+
+    memory.clear()
+    memory.add_memory(Message(Role.USER, "after clear"))
+    check("messages before a clear are not loaded again", [m["content"] for m in store.load("window")] == ["after clear"], store.load("window"))
+    store.close()
+
+
+def test_session_identity(path):
+    store = MemoryStore(path, max_sessions=1)
+    held = store.session("a")
+    store.session("b")  # evicts "a" from the LRU while it is still held
+    check("a held session evicted from the LRU is returned again", store.session("a") is held)
+    del held
+    store.session("b")
+    gc.collect()
+    check("sessions nobody holds are released", "a" not in store.live, list(store.live))
+    store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PersistentMemory checks")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_concurrent_processes(os.path.join(tmp, "shared.db"), args.processes, args.messages)
+        test_window_and_clear(os.path.join(tmp, "window.db"))
+        test_session_identity(os.path.join(tmp, "identity.db"))
+    print(f"{len(failures)} failed" if failures else "all passed")
+    sys.exit(1 if failures else 0)
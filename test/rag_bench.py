@@ -0,0 +1,141 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# Retrieval micro-benchmarks for agentos.rag on synthetic corpora.
+#
+#   python test/rag_bench.py                      # compare against test/rag_bench_baseline.json
+#   python test/rag_bench.py --update-baseline    # record a new baseline
+#   python test/rag_bench.py --sizes 100,1000 --max-regression 0.3
+#
+# Each benchmark reports the median wall time of --repeat runs; the run fails (exit 1)
+# when any median is slower than baseline * (1 + max_regression).
+
+import json
+import time
+import random
+import argparse
+import statistics
+
+from agentos.rag.data import CsvData
+from agentos.rag.split import CharacterSplit,RowSplit
+from agentos.rag.embedding import EmbeddingModel
+from agentos.rag.rerank import Rerank
+from agentos.rag.store import ChromaDB
+
+BASELINE_PATH = os.path.join(current_dir, "rag_bench_baseline.json")
+
+GENDERS = ["男", "女"]
+HISTORIES = ["无", "高血压", "高血脂", "糖尿病", "冠心病", "哮喘", "胃炎", "甲状腺结节"]
+SYMPTOMS = ["头晕", "胸闷", "偶尔头痛", "乏力", "咳嗽", "视力模糊", "腹痛", "失眠"]
+ITEMS = ["血常规", "尿常规", "心电图", "血脂检查", "血糖检测", "胸部X光", "腹部B超", "甲状腺功能"]
+
+
+def make_corpus(size:int, seed:int=0):
+    """Synthetic health-check rows in the same "header:value" format as csv_load."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(size):
+        rows.append(
+            f"患者ID:{100000 + i},性别:{rng.choice(GENDERS)},年龄(岁):{rng.randint(18, 85)},"
+            f"身高(cm):{rng.randint(150, 190)},体重(kg):{rng.randint(45, 100)},"
+            f"既往病史:{rng.choice(HISTORIES)},体检前的症状:{rng.choice(SYMPTOMS)},"
+            f"体检项目:{'、'.join(rng.sample(ITEMS, 3))}"
+        )
+    return CsvData("\n".join(rows))
+
+
+def measure(fn, repeat:int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_benchmarks(sizes, repeat:int, embedding_model:str, rerank_model:str):
+    import src.tools as tools
+
+    embedding = EmbeddingModel(model_name=embedding_model)
+    reranker = Rerank(model_name=rerank_model)
+    results = {}
+
+    for size in sizes:
+        corpus = make_corpus(size)
+        rows = RowSplit(chunk_row_size=1).split(corpus)
+
+        results[f"split_character/{size}"] = measure(lambda: CharacterSplit(chunk_size=128, chunk_overlap=16).split(corpus), repeat)
+        results[f"split_row/{size}"] = measure(lambda: RowSplit(chunk_row_size=1).split(corpus), repeat)
+        results[f"encode/{size}"] = measure(lambda: embedding.encode(rows), repeat)
+
+        def ingest():
+            store = ChromaDB.create_document(embedding_model=embedding)
+            store.add_data(rows)
+            store.chroma_client.delete_collection(ChromaDB.collection_name)
+        results[f"add_data/{size}"] = measure(ingest, repeat)
+
+        store = ChromaDB.create_document(embedding_model=embedding)
+        store.add_data(rows)
+        queries = [r.get_content()[12:] for r in rows[:20]]
+        results[f"query_data/{size}"] = measure(lambda: [store.query_data(q, query_num=5) for q in queries], repeat) / len(queries)
+        results[f"query_data_rerank/{size}"] = measure(
+            lambda: [store.query_data(q, query_num=5, rerank=True, reranker=reranker) for q in queries], repeat
+        ) / len(queries)
+
+        # the agent tools query the module level store in src.tools
+        tools.v1 = store
+        results[f"search_by_id/{size}"] = measure(lambda: [tools.search_by_id().run(str(100000 + i)) for i in range(20)], repeat) / 20
+        results[f"search_by_other/{size}"] = measure(lambda: [tools.search_by_other().run(3, q) for q in queries], repeat) / len(queries)
+        store.chroma_client.delete_collection(ChromaDB.collection_name)
+
+    return results
+
+
+def compare(results, baseline, max_regression:float):
+    regressions = []
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        ratio = seconds / base if base else None
+        flag = ""
+        if ratio is not None and ratio > 1 + max_regression:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        ratio_str = f"{ratio:6.2f}x" if ratio is not None else "    new"
+        print(f"{name:<28}{seconds * 1000:>12.3f} ms  {ratio_str}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="agentos.rag micro-benchmarks")
+    parser.add_argument("--sizes", default="100,1000", help="comma separated corpus sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed slowdown vs baseline, 0.25 = 25%%")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--embedding-model", default="BAAI/bge-base-zh-v1.5")
+    parser.add_argument("--rerank-model", default="cross-encoder/ms-marco-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        [int(s) for s in args.sizes.split(",")],
+        args.repeat,
+        args.embedding_model,
+        args.rerank_model,
+    )
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.max_regression)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.max_regression:.0%}")
+        sys.exit(1)
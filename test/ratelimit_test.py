@@ -0,0 +1,159 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# Checks of the client-side LLM flow control (agentos.utils.ratelimit) with fake
+# calls only: no model, network or API key needed.
+#
+#   python test/ratelimit_test.py
+#
+# Covers the priority order of rate-limiter waiters, acquire timeouts, SingleFlight
+# coalescing, and that call_model / stream_model pass the caller's llm_priority and
+# real token usage to the limiter. Exits 1 when a check fails.
+
+import time
+import types
+import threading
+from agentos.utils import utils
+from agentos.utils.ratelimit import RateLimiter, SingleFlight, llm_priority
+
+failures = []
+
+
+def check(name, ok, detail=""):
+    print(f"{'ok  ' if ok else 'FAIL'} {name}{'' if ok else '  ' + str(detail)}")
+    if not ok:
+        failures.append(name)
+
+
+def test_priority_order():
+    # 600 requests/minute: one request every 100 ms once the bucket is empty
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter.requests.level = 0
+    order = []
+    lock = threading.Lock()
+
+    def worker(priority):
+        limiter.acquire(priority=priority)
+        with lock:
+            order.append(priority)
+
+    threads = [threading.Thread(target=worker, args=("batch",)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.02)
+    # interactive callers arrive later but must not wait behind batch ones
+    threads += [threading.Thread(target=worker, args=("interactive",)) for _ in range(3)]
+    for t in threads[3:]:
+        t.start()
+    for t in threads:
+        t.join()
+    check("interactive waiters are served before batch waiters", order == ["interactive"] * 3 + ["batch"] * 3, order)
+
+
+def test_acquire_timeout():
+    limiter = RateLimiter(requests_per_minute=60)
+    limiter.requests.level = 0
+    start = time.monotonic()
+    admitted = limiter.acquire(timeout=0.1)
+    elapsed = time.monotonic() - start
+    check("acquire returns False once its timeout passes", admitted is False and elapsed < 0.5, (admitted, elapsed))
+    check("a disabled limiter always admits", RateLimiter().acquire(timeout=0) is True)
+
+
+def test_single_flight():
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.1)
+        return "answer"
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", fn))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    check("identical concurrent calls run once", len(calls) == 1 and results == ["answer"] * 5, (calls, results))
+
+    errors = []
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("upstream")
+
+    def follower():
+        try:
+            flight.do("error", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=follower) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    check("the leader's error reaches every follower", len(errors) == 3, errors)
+    check("finished keys are forgotten", not flight.calls, flight.calls)
+
+
+class SpyLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__()
+        self.acquired = []
+        self.adjusted = []
+
+    def acquire(self, tokens=0, priority=None, timeout=None):
+        self.acquired.append((priority, threading.current_thread().name))
+        return True
+
+    def adjust(self, tokens):
+        self.adjusted.append(tokens)
+
+
+def fake_stream(parts, total_tokens):
+    delta = lambda content: types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=content))], usage=None)
+    chunks = [delta(p) for p in parts]
+    chunks[-1].usage = types.SimpleNamespace(total_tokens=total_tokens)
+    return iter(chunks)
+
+
+def test_call_model_priority_and_usage():
+    spy = SpyLimiter()
+    saved = utils.RATE_LIMITER, utils.CALL_POLICY, utils._call_model, utils.get_policy_client
+    utils.RATE_LIMITER = spy
+    utils.configure_call_policy(models=["fake"], attempt_timeout=1, deadline=5)
+    utils._call_model = lambda messages, api_key, model, estimate, policy, limiter: "ok"
+    create = lambda model, messages, stream=False: fake_stream(["ab", "c"], 42)
+    utils.get_policy_client = lambda api_key, policy: types.SimpleNamespace(
+        chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    messages = [{"role": "user", "content": "abcd"}]
+    estimate = 4 + 512
+    try:
+        with llm_priority("batch"):
+            utils.call_model(messages, "key")
+            deltas = list(utils.stream_model(messages, "key"))
+        check("call_model passes the caller's llm_priority to the limiter", spy.acquired[0][0] == "batch", spy.acquired)
+        check("stream_model passes the caller's llm_priority to the limiter", spy.acquired[1][0] == "batch", spy.acquired)
+        check("stream_model yields the deltas", deltas == ["ab", "c"], deltas)
+        check("stream_model charges the streamed usage", spy.adjusted == [42 - estimate], spy.adjusted)
+
+        stream = utils.stream_model(messages, "key")
+        next(stream)
+        stream.close()
+        check("a stream closed early is charged the prompt and what was read", spy.adjusted[-1] == 4 + 2 - estimate, spy.adjusted)
+    finally:
+        utils.RATE_LIMITER, utils.CALL_POLICY, utils._call_model, utils.get_policy_client = saved
+
+
+if __name__ == "__main__":
+    test_priority_order()
+    test_acquire_timeout()
+    test_single_flight()
+    test_call_model_priority_and_usage()
+    print(f"{len(failures)} failed" if failures else "all passed")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,113 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# Recall@k vs. latency/memory of PCA-reduced stored vectors on the CSV and PDF corpora.
+#
+#   python test/reduce_bench.py
+#   python test/reduce_bench.py --dims 64,128,256,384 --k 10 --queries 200
+#
+# For every corpus the full 768-dim store is the reference: recall@k is the overlap of
+# the reduced store's top-k with the full store's top-k for the same query. Queries are
+# a fixed list of symptom questions plus a random sample of the corpus chunks.
+# Memory is the raw float32 vector payload (the HNSW graph adds the same per-node cost
+# at every dimension).
+
+import time
+import random
+import argparse
+import statistics
+
+from config.settings import Config
+from agentos.rag.load import DataLoader
+from agentos.rag.split import SentenceSplit
+from agentos.rag.embedding import EmbeddingModel
+from agentos.rag.store import ChromaDB
+from src.vectorstore import CSV_COLUMN_TYPES, PDF_CHUNK_TOKENS
+
+QUERIES = [
+    "高血压 头晕",
+    "糖尿病患者需要做哪些检查",
+    "胸闷气短是什么原因",
+    "女 45岁 甲状腺结节",
+    "男 60岁 冠心病 乏力",
+    "长期咳嗽应该检查什么",
+    "视力模糊 血糖偏高",
+    "失眠 偶尔头痛",
+]
+
+
+def load_corpora(embedding):
+    csv_rows = DataLoader(
+        project_root + Config.DATA["csv"],
+        encoding="utf-8",
+        row_mode=True,
+        column_types=CSV_COLUMN_TYPES
+    ).load_data()
+    pdf = DataLoader(project_root + Config.DATA["pdf"], encoding="utf-8").load_data()
+    pdf_chunks = SentenceSplit(
+        chunk_token_size=PDF_CHUNK_TOKENS,
+        tokenizer=embedding.embedding_model.tokenizer
+    ).split(pdf)
+    return {"csv": list(csv_rows), "pdf": list(pdf_chunks)}
+
+
+def build_store(embedding, data, embeddings, dim):
+    store = ChromaDB.create_document(embedding_model=embedding, metadata={"hnsw:space": "cosine"})
+    if dim:
+        store.fit_projection(embeddings, dim)
+    store.add_data(data, embeddings=[e.tolist() for e in embeddings])
+    return store
+
+
+def top_k(store, queries, k):
+    results, times = [], []
+    for query in queries:
+        start = time.perf_counter()
+        res = store.query_data(query, query_num=k)
+        times.append(time.perf_counter() - start)
+        results.append([r.get_content() for r in res])
+    return results, times
+
+
+def recall(reference, results):
+    return statistics.mean(
+        len(set(ref) & set(res)) / max(len(ref), 1) for ref, res in zip(reference, results)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PCA dimension vs. recall/latency/memory")
+    parser.add_argument("--dims", default="128,256,384")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100, help="corpus chunks sampled as extra queries")
+    parser.add_argument("--embedding-model", default="BAAI/bge-base-zh-v1.5")
+    args = parser.parse_args()
+    dims = [int(d) for d in args.dims.split(",")]
+
+    embedding = EmbeddingModel(model_name=args.embedding_model)
+    rng = random.Random(0)
+
+    for name, data in load_corpora(embedding).items():
+        embeddings = embedding.encode(data)
+        sample = rng.sample(data, min(args.queries, len(data)))
+        queries = QUERIES + [d.get_content() for d in sample]
+        k = min(args.k, len(data))
+
+        full = build_store(embedding, data, embeddings, None)
+        reference, full_times = top_k(full, queries, k)
+        full_dim = len(embeddings[0])
+        full.chroma_client.delete_collection(ChromaDB.collection_name)
+
+        print(f"{name}: {len(data)} chunks, {len(queries)} queries, recall@{k} against {full_dim} dims")
+        print(f"  {'dim':>5}  {'recall':>7}  {'p50 ms':>7}  {'vectors MB':>10}")
+        print(f"  {full_dim:>5}  {1.0:>7.3f}  {statistics.median(full_times) * 1000:>7.2f}  "
+              f"{len(data) * full_dim * 4 / 2**20:>10.2f}")
+        for dim in dims:
+            store = build_store(embedding, data, embeddings, dim)
+            results, times = top_k(store, queries, k)
+            store.chroma_client.delete_collection(ChromaDB.collection_name)
+            print(f"  {dim:>5}  {recall(reference, results):>7.3f}  {statistics.median(times) * 1000:>7.2f}  "
+                  f"{len(data) * dim * 4 / 2**20:>10.2f}")
@@ -0,0 +1,197 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+# Checks of CallPolicy (agentos.utils.resilience) with fake upstream calls only:
+# no model, network or API key needed.
+#
+#   python test/resilience_test.py
+#
+# Covers retries, model fallback, non-retryable errors, deadlines, hedging,
+# abandoned attempts, rate-limiter admission outside the attempt timeout and the
+# streamed path (first-token timeout, stalls, early close). Exits 1 when a check fails.
+
+import time
+import threading
+from agentos.utils.resilience import CallPolicy, DeadlineExceeded, is_retryable
+
+failures = []
+
+
+def check(name, ok, detail=""):
+    print(f"{'ok  ' if ok else 'FAIL'} {name}{'' if ok else '  ' + str(detail)}")
+    if not ok:
+        failures.append(name)
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def policy(**kwargs):
+    options = dict(models=["a", "b"], attempt_timeout=0.3, chunk_timeout=0.3, deadline=3, max_retries=1, backoff_base=0.01, backoff_cap=0.02)
+    options.update(kwargs)
+    return CallPolicy(**options)
+
+
+def test_classification():
+    check("429 and 5xx are retryable", is_retryable(HTTPError(429)) and is_retryable(HTTPError(503)))
+    check("400 and 401 are not retryable", not is_retryable(HTTPError(400)) and not is_retryable(HTTPError(401)))
+    check("timeouts and connection errors are retryable", is_retryable(TimeoutError()) and is_retryable(ConnectionError()))
+
+
+def test_retry_and_fallback():
+    calls = []
+
+    def flaky(model):
+        calls.append(model)
+        if len(calls) == 1:
+            raise HTTPError(503)
+        return model
+
+    p = policy()
+    check("a retryable error is retried on the same model", p.call(flaky) == "a" and calls == ["a", "a"], calls)
+
+    calls.clear()
+
+    def bad_request(model):
+        calls.append(model)
+        if model == "a":
+            raise HTTPError(400)
+        return model
+
+    check("a non-retryable error falls back to the next model", p.call(bad_request) == "b" and calls == ["a", "b"], calls)
+
+    calls.clear()
+
+    def unauthorized(model):
+        calls.append(model)
+        raise HTTPError(401)
+
+    try:
+        p.call(unauthorized)
+        raised = False
+    except HTTPError:
+        raised = True
+    check("an auth error is raised without retry or fallback", raised and calls == ["a"], calls)
+
+
+def test_deadline_and_abandoned():
+    release = threading.Event()
+
+    def hang(model):
+        release.wait(5)
+        return model
+
+    p = policy(attempt_timeout=0.2, max_retries=5)
+    start = time.monotonic()
+    try:
+        p.call(hang, deadline=0.5)
+        error = None
+    except Exception as e:
+        error = e
+    elapsed = time.monotonic() - start
+    check("a hung upstream raises DeadlineExceeded at the deadline", isinstance(error, DeadlineExceeded) and elapsed < 1.0, (error, elapsed))
+    stats = p.stats()
+    check("timed-out running attempts are counted as abandoned", stats["abandoned_running"] >= 1, stats)
+    release.set()
+    time.sleep(0.1)
+    check("abandoned attempts are released when they finish", p.stats()["abandoned_running"] == 0, p.stats())
+
+
+def test_hedge():
+    p = policy(models=["a"], hedge=True, attempt_timeout=1)
+    for _ in range(p.latency.min_samples):
+        p.latency.observe("a", 0.05)
+    calls = []
+    lock = threading.Lock()
+
+    def slow_first(model):
+        with lock:
+            calls.append(model)
+            first = len(calls) == 1
+        time.sleep(0.8 if first else 0.01)
+        return "first" if first else "hedge"
+
+    result = p.call(slow_first)
+    stats = p.stats()
+    check("a slow attempt is hedged and the faster answer wins", result == "hedge" and stats["hedges"] == 1 and stats["hedge_wins"] == 1, (result, stats))
+
+
+def test_admission_outside_attempt_timeout():
+    p = policy(models=["a"], attempt_timeout=0.2)
+
+    def admit(timeout):
+        time.sleep(0.4)
+        return True
+
+    result = p.call(lambda model: "ok", admit=admit)
+    check("time queued for the rate limiter does not count against the attempt", result == "ok" and p.stats()["retries"] == 0, p.stats())
+
+    try:
+        p.call(lambda model: "ok", deadline=0.2, admit=lambda timeout: False)
+        error = None
+    except Exception as e:
+        error = e
+    check("a limiter that does not admit within the deadline raises DeadlineExceeded", isinstance(error, DeadlineExceeded), error)
+
+
+class FakeStream:
+    def __init__(self, parts, first_delay=0.0, stall_after=None):
+        self.parts = parts
+        self.first_delay = first_delay
+        self.stall_after = stall_after
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        time.sleep(self.first_delay)
+        for i, part in enumerate(self.parts):
+            if self.stall_after is not None and i >= self.stall_after:
+                self.closed.wait(5)
+            if self.closed.is_set():
+                return
+            yield part
+
+    def close(self):
+        self.closed.set()
+
+
+def test_stream():
+    streams = {"a": FakeStream(["x"], first_delay=2), "b": FakeStream(["he", "llo"])}
+    p = policy()
+    start = time.monotonic()
+    deltas = list(p.stream(lambda model: streams[model], lambda chunk: chunk))
+    check("a stream without a first token falls back to the next model", deltas == ["he", "llo"] and p.stats()["fallbacks"] == 1, (deltas, p.stats()))
+    check("the first-token timeout bounds the wait", time.monotonic() - start < 1.5, time.monotonic() - start)
+
+    stalled = FakeStream(["x", "y"], stall_after=1)
+    received = []
+    try:
+        for delta in policy(models=["a"]).stream(lambda model: stalled, lambda chunk: chunk):
+            received.append(delta)
+        error = None
+    except Exception as e:
+        error = e
+    check("a stall after the first delta is raised, not retried", isinstance(error, TimeoutError) and received == ["x"], (error, received))
+    check("a stalled stream is closed", stalled.closed.is_set())
+
+    early = FakeStream(["1", "2", "3"])
+    stream = policy(models=["a"]).stream(lambda model: early, lambda chunk: chunk)
+    first = next(stream)
+    stream.close()
+    check("closing the generator closes the upstream stream", first == "1" and early.closed.is_set())
+
+
+if __name__ == "__main__":
+    test_classification()
+    test_retry_and_fallback()
+    test_deadline_and_abandoned()
+    test_hedge()
+    test_admission_outside_attempt_timeout()
+    test_stream()
+    print(f"{len(failures)} failed" if failures else "all passed")
+    sys.exit(1 if failures else 0)
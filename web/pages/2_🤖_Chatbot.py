@@ -1,5 +1,16 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+import uuid
+import logging
 import streamlit as st
-from together import Together
+from collections import deque
+from agentos.utils import get_client, acquire_rate_limit
+from src.chat import StreamRenderer, ChatSessionStore
+from config.settings import Config
 
 st.set_page_config(
     page_title="Medical Chatbot",
@@ -103,9 +114,33 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# 初始化session状态
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+@st.cache_resource
+def get_chat_store():
+    """进程内所有用户共享的有界会话存储，token数用聊天模型的分词器计算"""
+    try:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(Config.CHAT_TOKENIZER)
+        count_tokens = lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+    except Exception as e:
+        # 离线、无法访问Hugging Face Hub或未安装transformers时按字符数估算(中文约一字一token，偏保守)
+        logging.warning(f"Tokenizer {Config.CHAT_TOKENIZER} unavailable, counting characters: {e}")
+        count_tokens = len
+    return ChatSessionStore(
+        count_tokens,
+        max_session_tokens=Config.CHAT_SESSION_TOKENS,
+        max_total_tokens=Config.CHAT_TOTAL_TOKENS,
+        idle_ttl=Config.CHAT_IDLE_TTL,
+    )
+
+
+# 初始化session状态(对话内容保存在服务端会话存储中，这里只保存会话ID)
+chat_store = get_chat_store()
+if "chat_session_id" not in st.session_state:
+    st.session_state.chat_session_id = uuid.uuid4().hex
+session_id = st.session_state.chat_session_id
+if "reply_stats" not in st.session_state:
+    # 只保留最近的回复统计，会话占用的内存保持有界
+    st.session_state.reply_stats = deque(maxlen=Config.CHAT_REPLY_STATS)
 if "model" not in st.session_state:
     st.session_state.model = "deepseek-ai/DeepSeek-V3"
 
@@ -133,9 +168,11 @@ with st.sidebar:
         key="model_selector"
     )
     api_key = st.text_input("API Key", type="password")
+    use_semantic_cache = st.checkbox("Semantic Cache", value=True, help="Answer near-duplicate questions from previous replies")
     st.markdown("---")
     if st.button("Clear Chat History", use_container_width=True):
-        st.session_state.messages = []
+        chat_store.clear(session_id)
+        st.session_state.reply_stats.clear()
 
 
 # 主界面
@@ -147,15 +184,33 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource
+def get_semantic_cache():
+    """进程内共享的语义缓存（基于bge向量的相似问题缓存）"""
+    from agentos.rag import SemanticCache
+    if Config.RETRIEVAL_SERVICE:
+        # 配置了共享检索服务时使用服务端的嵌入模型，本进程不加载模型
+        from agentos.rag import RemoteEmbeddingModel
+        embedding = RemoteEmbeddingModel(Config.RETRIEVAL_SERVICE)
+    else:
+        from agentos.rag import EmbeddingModel
+        embedding = EmbeddingModel(model_name="BAAI/bge-base-zh-v1.5", backend=Config.EMBEDDING_BACKEND)
+    return SemanticCache(embedding, threshold=0.92, ttl=24 * 3600)
+
+
 # 处理流式响应
 def generate_response(messages):
-    client = Together(
-        api_key=api_key,
-        base_url="https://api.together.xyz/v1",
-    )
-    full_response = ""
+    client = get_client(api_key)
     message_placeholder = st.empty()
+
+    def render(text, done):
+        cursor = "" if done else "_"
+        message_placeholder.markdown(f'<div class="message-container assistant-message">{text}{cursor}</div>', unsafe_allow_html=True)
+
+    renderer = StreamRenderer(render)
+    completion_tokens = None
     try:
+        acquire_rate_limit(messages, "interactive", max_completion_tokens=1000)
         for chunk in client.chat.completions.create(
             model=st.session_state.model,
             messages=messages,
@@ -163,10 +218,15 @@ def generate_response(messages):
             temperature=0.3,
             max_tokens=1000
         ):
-            if chunk.choices[0].delta.content:
-                full_response += chunk.choices[0].delta.content
-                message_placeholder.markdown(f'<div class="message-container assistant-message">{full_response}_</div>', unsafe_allow_html=True)
-        message_placeholder.markdown(f'<div class="message-container assistant-message">{full_response}</div>', unsafe_allow_html=True)
+            if getattr(chunk, "usage", None):
+                completion_tokens = chunk.usage.completion_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                renderer.feed(chunk.choices[0].delta.content)
+        full_response = renderer.finish(completion_tokens)
+        stats = renderer.stats()
+        st.session_state.reply_stats.append(stats)
+        if stats["ttft"] is not None and stats["tokens_per_sec"]:
+            st.markdown(f'<div class="response-time">TTFT {stats["ttft"]:.2f}s · {stats["tokens_per_sec"]:.1f} tokens/s</div>', unsafe_allow_html=True)
         return full_response
     except Exception as e:
         st.error(f"API Error: {str(e)}")
@@ -174,7 +234,7 @@ def generate_response(messages):
 
 
 # 显示历史消息
-for message in st.session_state.messages:
+for message in chat_store.messages(session_id):
     role_class = "user-message" if message["role"] == "user" else "assistant-message"
     with st.chat_message(message["role"]):
         st.markdown(f'<div class="message-container {role_class}">{message["content"]}</div>', unsafe_allow_html=True)
@@ -187,17 +247,33 @@ if prompt := st.chat_input("Enter your medical query..."):
         st.stop()
 
     # 添加用户消息到历史
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    chat_store.append(session_id, "user", prompt)
     with st.chat_message("user"):
         st.markdown(f'<div class="message-container user-message">{prompt}</div>', unsafe_allow_html=True)
     
     # 构建带系统提示的完整消息
     chat_history = [{"role": "system", "content": MEDICAL_SYSTEM_PROMPT}]
-    chat_history += st.session_state.messages[-6:] # 保留最近3轮对话
+    window = chat_store.window(session_id, Config.CHAT_HISTORY_TOKENS) # 按token预算保留最近的对话
+    chat_history += window
     
-    # 生成并显示助手回复
+    # 生成并显示助手回复（语义缓存命中时直接返回已有回答）
+    # 只有模型看到的历史仅为本条提问时才使用缓存，否则"那副作用呢？"这类追问会命中其他用户的无关回答
+    response = None
+    query_embedding = None
+    use_cache = use_semantic_cache and len(window) == 1
+    if use_cache:
+        semantic_cache = get_semantic_cache()
+        query_embedding = semantic_cache.embed(prompt)
+        if query_embedding is not None:
+            response = semantic_cache.lookup(prompt, st.session_state.model, embedding=query_embedding)
     with st.chat_message("assistant"):
-        response = generate_response(chat_history)
+        if response:
+            st.markdown(f'<div class="message-container assistant-message">{response}</div>', unsafe_allow_html=True)
+            st.markdown('<div class="response-time">⚡ cached answer</div>', unsafe_allow_html=True)
+        else:
+            response = generate_response(chat_history)
+            if response and query_embedding is not None:
+                semantic_cache.add(prompt, response, st.session_state.model, embedding=query_embedding)
     if response:
-        st.session_state.messages.append({"role": "assistant", "content": response})
+        chat_store.append(session_id, "assistant", response)
     
@@ -1,9 +1,20 @@
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+import time
 import streamlit as st
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
 import pandas as pd
 import pydeck as pdk
-from geopy.distance import geodesic
+from src.hospitals import HospitalCache
+from src.hospital_index import HospitalIndex
+from src.cache import DiskCache
+from config.settings import Config
 BAIDU_API_AK = "kfLxkGbOE95apSymbmlTBLRjIt4Jsd7U"
 
 
@@ -14,28 +25,46 @@ st.set_page_config(
 
 
 # --------------------- Functions ---------------------
+IP_SERVICES = [
+    {'url': 'https://www.taobao.com/help/getip.php', 'pattern': 'ip', 'type': 'text'},
+    {'url': 'https://ip.360.cn/IPShare/info', 'key': 'ip'},
+    {'url': 'https://ipinfo.io/json', 'key': 'ip'},
+]
+LOCATION_TTL = 600  # 会话内定位结果的有效期（秒）
+
+
+def query_ip_service(service):
+    """请求单个IP服务，失败时抛出异常"""
+    response = requests.get(service['url'], timeout=3)
+    response.raise_for_status()
+    if 'type' in service and service['type'] == 'text':
+        ip = response.text.strip().split('=')[-1].strip("'")
+        if ip.count('.') == 3:
+            return ip
+    else:
+        data = response.json()
+        if 'key' in service:
+            ip = data.get(service['key'], '').split(',')[0].strip()
+            if ip:
+                return ip
+    raise ValueError("no ip in response")
+
+
 def get_client_ip():
-    """获取客户端IP（优先国内服务）"""
-    services = [
-        {'url': 'https://www.taobao.com/help/getip.php', 'pattern': 'ip', 'type': 'text'},
-        {'url': 'https://ip.360.cn/IPShare/info', 'key': 'ip'},
-        {'url': 'https://ipinfo.io/json', 'key': 'ip'},
-    ]
-    for service in services:
-        try:
-            response = requests.get(service['url'], timeout=3)
-            response.raise_for_status()
-            if 'type' in service and service['type'] == 'text':
-                ip = response.text.strip().split('=')[-1].strip("'")
-                if ip.count('.') == 3:
-                    return ip
-            else:
-                data = response.json()
-                if 'key' in service:
-                    return data.get(service['key'], '').split(',')[0].strip()    
-        except Exception as e:
-            logging.warning(f"Service {service['url']} failed: {str(e)}")
-            continue   
+    """获取客户端IP（并发请求所有服务，第一个成功的结果胜出）"""
+    executor = ThreadPoolExecutor(max_workers=len(IP_SERVICES))
+    futures = {executor.submit(query_ip_service, service): service for service in IP_SERVICES}
+    try:
+        for future in as_completed(futures, timeout=3.5):
+            try:
+                return future.result()
+            except Exception as e:
+                logging.warning(f"Service {futures[future]['url']} failed: {str(e)}")
+    except TimeoutError:
+        pass
+    finally:
+        # 不等待剩余请求，未开始的直接取消
+        executor.shutdown(wait=False, cancel_futures=True)
     logging.error("All IP services unavailable")
     return None
 
@@ -58,50 +87,82 @@ def get_location(ip):
         return None, None, "Service exception"
 
 
+def get_auto_location():
+    """自动定位结果在会话内缓存LOCATION_TTL秒，避免每次rerun都重新请求"""
+    cached = st.session_state.get("auto_location")
+    if cached and time.time() - cached["time"] < LOCATION_TTL:
+        return cached["value"]
+    ip = get_client_ip()
+    if ip:
+        lat, lon, accuracy = get_location(ip)
+    else:
+        lat, lon, accuracy = None, None, "Location failed"
+    if lat and lon:
+        st.session_state.auto_location = {"time": time.time(), "value": (lat, lon, accuracy)}
+    return lat, lon, accuracy
+
+
+@st.cache_resource
+def get_geocode_disk_cache():
+    return DiskCache(project_root + Config.GEOCODE_CACHE_PATH, Config.GEOCODE_CACHE_TTL)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _geocode(address):
+    """地址地理编码（进程内LRU -> 磁盘缓存 -> 百度地图API），失败时抛出异常，不会被缓存"""
+    disk_cache = get_geocode_disk_cache()
+    location = disk_cache.get(address)
+    if location is not None:
+        return tuple(location)
+    url = f"http://api.map.baidu.com/geocoding/v3/?address={address}&output=json&ak={BAIDU_API_AK}"
+    response = requests.get(url, timeout=5)
+    data = response.json()
+    if data['status'] != 0:
+        raise LookupError(f"status {data['status']}")
+    location = data['result']['location']
+    disk_cache.set(address, [location['lat'], location['lng']])
+    return location['lat'], location['lng']
+
+
 def geocode_address(address):
-    """地址地理编码（使用百度地图API）"""
+    """地址地理编码（使用百度地图API，结果带缓存）"""
     try:
-        url = f"http://api.map.baidu.com/geocoding/v3/?address={address}&output=json&ak={BAIDU_API_AK}"
-        response = requests.get(url, timeout=5)
-        data = response.json()
-        if data['status'] == 0:
-            location = data['result']['location']
-            return location['lat'], location['lng']
-        return None, None
+        return _geocode(address.strip())
     except Exception as e:
         logging.error(f"Geocoding failed: {str(e)}")
         return None, None
 
 
-def get_hospitals(lat, lon, radius=20000):
-    """通过Overpass API获取医院数据"""
-    overpass_url = "https://overpass-api.de/api/interpreter"
-    query = f"""
-    [out:json];
-    node["amenity"="hospital"](around:{radius},{lat},{lon});
-    out body;
-    """
+@st.cache_resource
+def get_hospital_cache():
+    """进程内共享的医院缓存（按geohash格子缓存，磁盘持久化）"""
+    return HospitalCache()
+
+
+@st.cache_resource
+def get_hospital_index():
+    """加载离线医院空间索引（进程内只加载一次）"""
+    return HospitalIndex.load(project_root + Config.HOSPITAL_INDEX_PATH)
+
+
+def get_offline_hospitals(lat, lon, radius=20000, k=25):
+    """从离线索引查询半径内最近的k家医院"""
     try:
-        response = requests.post(overpass_url, data=query, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        hospitals = []
-        for element in data['elements']:
-            hospitals.append({
-                'name': element['tags'].get('name', '未知医院'),
-                'lat': element['lat'],
-                'lon': element['lon'],
-            })
+        hospitals = get_hospital_index().nearest(lat, lon, k=k, radius_km=radius / 1000)
         return pd.DataFrame(hospitals)
     except Exception as e:
-        st.error(f"Failed to get hospital data: {str(e)}")
+        st.error(f"Failed to query offline hospital index: {str(e)}")
         return pd.DataFrame()
 
 
-def calculate_distance(row, user_loc):
-    """计算医院与用户的距离（千米）"""
-    hospital_loc = (row['lat'], row['lon'])
-    return geodesic(user_loc, hospital_loc).km
+def get_hospitals(lat, lon, radius=20000):
+    """获取半径内的医院数据（优先读取格子缓存，未命中时才请求Overpass）"""
+    try:
+        hospitals = get_hospital_cache().get_hospitals(lat, lon, radius)
+        return pd.DataFrame(hospitals)
+    except Exception as e:
+        st.error(f"Failed to get hospital data: {str(e)}")
+        return pd.DataFrame()
 
 
 # --------------------- Page Layout ---------------------
@@ -123,6 +184,14 @@ with st.sidebar:
     # Search parameters
     search_radius = st.slider("Search Radius (km)", 1, 50, 20)
     min_distance = st.slider("Number of Nearest Hospitals to Display", 1, 50, 25)
+    # Offline data source is only offered when the index has been built
+    data_source = "Online"
+    if os.path.exists(project_root + Config.HOSPITAL_INDEX_PATH):
+        data_source = st.radio("Data Source",
+                               ["Online", "Offline"],
+                               index=0,
+                               help="Offline uses the local hospital index",
+                               horizontal=True)
     st.markdown("------")
     if mode == "Manual_Mode":
         address = st.text_input("Please enter a detailed address", 
@@ -139,13 +208,8 @@ with st.sidebar:
     else:
         # Automatic positioning
         with st.spinner('Fetching location information...'):
-            ip = get_client_ip()
-            if ip:
-                lat, lon, accuracy = get_location(ip)
-                user_loc = (lat, lon) if lat and lon else None
-            else:
-                user_loc = None
-                accuracy = "Location failed"
+            lat, lon, accuracy = get_auto_location()
+            user_loc = (lat, lon) if lat and lon else None
     # Display location information
     if user_loc:
         try:
@@ -166,16 +230,15 @@ with st.sidebar:
 
 # --------------------- Data Fetching ---------------------
 with st.spinner(f'Searching for hospitals within {search_radius} km radius...'):
-    hospitals_df = get_hospitals(*user_loc, search_radius*1000)
+    if data_source == "Offline":
+        hospitals_df = get_offline_hospitals(*user_loc, search_radius*1000, min_distance)
+    else:
+        hospitals_df = get_hospitals(*user_loc, search_radius*1000)
     if hospitals_df.empty:
         st.warning("⚠️ No medical institutions found within current range")
         st.stop()
-    # Calculate distances
-    hospitals_df['distance'] = hospitals_df.apply(
-        lambda row: calculate_distance(row, user_loc), 
-        axis=1
-    )
-    hospitals_df = hospitals_df.sort_values('distance').head(min_distance)
+    # Results are already sorted by distance
+    hospitals_df = hospitals_df.head(min_distance)
 
 
 # --------------------- Content Display ---------------------